@@ -1,7 +1,12 @@
 import pandas as pd
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common import storage
 
 # Read the CSV file with your specific path
-df = pd.read_csv(r"C:\Users\hello\OneDrive\Desktop\Wrapped Stablecoins\Crypto_Price_Data\BTC_USD_Price_Daily\btc_usd_daily_with_volatility.csv")
+df = storage.read_table(r"C:\Users\hello\OneDrive\Desktop\Wrapped Stablecoins\Crypto_Price_Data\BTC_USD_Price_Daily\btc_usd_daily_with_volatility.csv")
 
 # Convert date column to datetime
 df['date'] = pd.to_datetime(df['date'])
@@ -20,7 +25,7 @@ df_filtered = df_filtered.reset_index(drop=True)
 
 # Save to same directory with new name
 output_path = r"C:\Users\hello\OneDrive\Desktop\Wrapped Stablecoins\Crypto_Price_Data\BTC_USD_Price_Daily\btc_usd_daily_2020_2025.csv"
-df_filtered.to_csv(output_path, index=False)
+storage.write_table(df_filtered, output_path)
 
 print(f"Original dataset: {len(df)} rows")
 print(f"Filtered dataset: {len(df_filtered)} rows")
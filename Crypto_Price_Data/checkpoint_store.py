@@ -0,0 +1,182 @@
+"""
+Append-only checkpoint store for candle backfills.
+
+Every fetched window is written once as its own small Parquet segment and
+recorded as one line in manifest.jsonl. A checkpoint therefore only costs the
+new window's data, and resuming reads the manifest instead of re-parsing a
+large CSV. Without pyarrow (pip install pyarrow) segments are written as NumPy
+.npy files instead, like common.storage falls back to CSV.
+"""
+
+import calendar
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+class CandleCheckpointStore:
+    """
+    Directory of per-window Parquet segments plus a manifest of completed windows.
+
+    Segments hold NumPy structured arrays (one column per field) and are written and
+    read with pyarrow directly (or np.save/np.load), so no DataFrame is built per
+    window. Windows are keyed
+    by their (start, end) Unix timestamps. Windows that returned no candles are still
+    recorded so they are not refetched on resume.
+    """
+
+    MANIFEST = "manifest.jsonl"
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, self.MANIFEST)
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def window_key(window):
+        # Naive window bounds are UTC, as in coinbase_candles.utc_seconds
+        start, end = window
+        return calendar.timegm(start.utctimetuple()), calendar.timegm(end.utctimetuple())
+
+    def read_manifest(self):
+        """
+        Return the manifest entries, skipping a partially written last line.
+        """
+        if not os.path.exists(self.manifest_path):
+            return []
+
+        entries = []
+        with open(self.manifest_path) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return entries
+
+    def completed_windows(self):
+        """
+        Set of (start_ts, end_ts) keys for every window already checkpointed.
+        """
+        return {(entry["start"], entry["end"]) for entry in self.read_manifest()}
+
+    def append(self, window, candles):
+        """
+        Write one window's candles (a structured array) as a new segment and record it
+        in the manifest. The segment is written before the manifest line, so an
+        interrupted append simply leaves the window to be refetched.
+        """
+        start_ts, end_ts = self.window_key(window)
+        segment = None
+        rows = 0
+
+        if candles is not None and len(candles) > 0:
+            if pa is not None:
+                segment = f"segment_{start_ts}_{end_ts}.parquet"
+                table = pa.table({name: candles[name] for name in candles.dtype.names})
+                pq.write_table(table, os.path.join(self.directory, segment))
+            else:
+                segment = f"segment_{start_ts}_{end_ts}.npy"
+                np.save(os.path.join(self.directory, segment), candles)
+            rows = len(candles)
+
+        with self.lock:
+            with open(self.manifest_path, "a") as f:
+                f.write(json.dumps({"start": start_ts, "end": end_ts, "rows": rows, "file": segment}) + "\n")
+
+    def total_rows(self):
+        return sum(entry["rows"] for entry in self.read_manifest())
+
+    def read_segment(self, name):
+        """
+        One segment as a structured array.
+        """
+        path = os.path.join(self.directory, name)
+        if name.endswith(".npy"):
+            return np.load(path)
+
+        table = pq.read_table(path)
+        dtype = np.dtype([(field.name, field.type.to_pandas_dtype()) for field in table.schema])
+        out = np.empty(table.num_rows, dtype=dtype)
+        for name in dtype.names:
+            out[name] = table.column(name).to_numpy()
+        return out
+
+    def load(self):
+        """
+        Load every checkpointed segment into one structured array (or None if empty).
+        """
+        segments = [self.read_segment(entry["file"]) for entry in self.read_manifest() if entry["file"]]
+        if not segments:
+            return None
+        return np.concatenate(segments)
+
+    def clear(self):
+        """
+        Delete the checkpoint directory once the backfill has been saved.
+        """
+        if os.path.exists(self.directory):
+            shutil.rmtree(self.directory)
+
+
+class CoveredWindowLog:
+    """
+    Windows Coinbase has answered successfully, kept across runs (unlike the
+    checkpoint, which is cleared once a backfill is saved).
+
+    Coinbase omits candles for intervals with no trades and for the time before a
+    product was listed, so a slot inside a covered window that has no candle is
+    empty upstream and does not need to be requested again. One JSON line
+    [start_ts, end_ts) per window.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def add(self, start_ts, end_ts):
+        if end_ts <= start_ts:
+            return
+        with self.lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps([int(start_ts), int(end_ts)]) + "\n")
+
+    def ranges(self):
+        """
+        (starts, ends) int64 arrays of every logged window, sorted by start.
+        """
+        pairs = []
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        pairs.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+
+        ranges = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        ranges = ranges[np.argsort(ranges[:, 0], kind="stable")]
+        return ranges[:, 0], ranges[:, 1]
+
+    def covered(self, slots):
+        """
+        Boolean mask of the slot start times (Unix seconds) inside a logged window.
+        """
+        starts, ends = self.ranges()
+        if len(starts) == 0:
+            return np.zeros(len(slots), dtype=bool)
+
+        # Latest end among the windows starting at or before each slot
+        reach = np.maximum.accumulate(ends)
+        i = np.searchsorted(starts, slots, side="right") - 1
+        return (i >= 0) & (slots < reach[np.maximum(i, 0)])
@@ -0,0 +1,679 @@
+"""
+Shared Coinbase candle fetch engine.
+
+One fetcher class handles every product ID and granularity; the BTC/ETH price
+scripts are thin subclasses that only add their own analysis. Running this file
+directly backfills every product in PRODUCTS in one go, sharing the pooled HTTP
+session and its adaptive rate limiter across all of them.
+"""
+
+import calendar
+import requests
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta, timezone
+import time
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from Crypto_Price_Data.checkpoint_store import CandleCheckpointStore, CoveredWindowLog
+from Crypto_Price_Data.price_store import PriceStore
+from common import storage, transport
+from urllib.parse import urlsplit
+
+BASE_URL = "https://api.coinbase.com/api/v3/brokerage"
+
+# Products backfilled by the multi-product run - adding a pair is one line here
+PRODUCTS = [
+    "BTC-USD",
+    "ETH-USD",
+    "USDT-USD",
+    "DAI-USD",
+]
+
+# Granularity mapping from seconds to API format
+GRANULARITY_MAP = {
+    60: "ONE_MINUTE",
+    300: "FIVE_MINUTE",
+    900: "FIFTEEN_MINUTE",
+    3600: "ONE_HOUR",
+    21600: "SIX_HOUR",
+    86400: "ONE_DAY"
+}
+
+# Decoded candle layout - one preallocated structured array per API response
+CANDLE_DTYPE = np.dtype([
+    ('timestamp', np.int64),  # candle start, Unix seconds (UTC)
+    ('low', np.float64),
+    ('high', np.float64),
+    ('open', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64)
+])
+
+# Granularity labels used in output file names
+GRANULARITY_LABELS = {
+    60: "1min",
+    300: "5min",
+    900: "15min",
+    3600: "hourly",
+    21600: "6hour",
+    86400: "daily"
+}
+
+
+def utc_seconds(dt):
+    """
+    Unix seconds for a datetime. Naive datetimes are read as UTC, the convention
+    of the candle timestamps themselves, so results do not depend on the host's timezone.
+    """
+    return calendar.timegm(dt.utctimetuple())
+
+
+def from_utc_seconds(ts):
+    """
+    Unix seconds -> naive UTC datetime (the inverse of utc_seconds).
+    """
+    return datetime.fromtimestamp(int(ts), timezone.utc).replace(tzinfo=None)
+
+
+def decode_candles(candles):
+    """
+    Decode a raw JSON candle list straight into a CANDLE_DTYPE structured array,
+    sorted by timestamp. Coinbase sends every field as a string.
+    """
+    count = len(candles)
+    out = np.empty(count, dtype=CANDLE_DTYPE)
+    out['timestamp'] = np.fromiter((c['start'] for c in candles), dtype=np.int64, count=count)
+    for col in ['low', 'high', 'open', 'close', 'volume']:
+        out[col] = np.fromiter((c[col] for c in candles), dtype=np.float64, count=count)
+
+    # Coinbase returns newest first
+    return out[np.argsort(out['timestamp'], kind='stable')]
+
+
+def candles_to_frame(candles):
+    """
+    Convert a CANDLE_DTYPE array into the DataFrame layout used for all outputs.
+    """
+    df = pd.DataFrame({name: candles[name] for name in CANDLE_DTYPE.names})
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+    return df
+
+
+class CoinbaseCandleFetcher:
+    """
+    Fetch historical candle data for any product from the Coinbase Advanced Trade API (v3).
+
+    All fetchers share the pooled Coinbase session from common.transport, which is paced
+    by the shared adaptive rate limiter, so a multi-product run reuses connections and
+    stays inside a single request budget.
+    """
+
+    def __init__(self, product_id="BTC-USD", session=None, checkpoint_dir=".", price_store=None):
+        self.base_url = BASE_URL
+        self.product_id = product_id
+        self.granularity_map = GRANULARITY_MAP
+
+        self.session = session if session is not None else transport.get_session(BASE_URL)
+        self.checkpoint_dir = checkpoint_dir
+
+        # Month-partitioned store that range queries read from
+        self.price_store = price_store if price_store is not None else PriceStore()
+
+        # e.g. "BTC-USD" -> "btc_usd" for file names, "BTC" for display
+        self.file_prefix = product_id.lower().replace("-", "_")
+        self.asset = product_id.split("-")[0]
+
+    def fetch_candle_array(self, start_time=None, end_time=None, granularity=300, limit=300):
+        """
+        Fetch historical candles from Coinbase Advanced Trade API as a CANDLE_DTYPE array.
+        Backfills keep candles in this form and convert to pandas once at the end.
+
+        An empty array is a successful reply with no candles (no trades, or before the
+        product was listed); None means the request failed.
+        """
+
+        # Convert granularity to API format
+        if granularity not in self.granularity_map:
+            print(f"Invalid granularity: {granularity}. Valid values: {list(self.granularity_map.keys())}")
+            return None
+
+        granularity_str = self.granularity_map[granularity]
+
+        # Construct the endpoint URL
+        endpoint = f"{self.base_url}/market/products/{self.product_id}/candles"
+
+        # Set up parameters
+        params = {
+            "granularity": granularity_str,
+            "limit": min(limit, 350)  # API max is 350
+        }
+
+        # Convert datetime to Unix timestamp if needed
+        if start_time:
+            if isinstance(start_time, datetime):
+                params["start"] = str(utc_seconds(start_time))
+            else:
+                params["start"] = start_time
+
+        if end_time:
+            if isinstance(end_time, datetime):
+                params["end"] = str(utc_seconds(end_time))
+            else:
+                params["end"] = end_time
+
+        # Validate range if both provided
+        if start_time and end_time:
+            start_ts = int(params["start"])
+            end_ts = int(params["end"])
+
+            # Calculate number of candles in the range
+            time_diff = end_ts - start_ts
+            num_candles = time_diff / granularity
+
+            if num_candles > 300:
+                # Adjust end time to stay within limit
+                params["end"] = str(start_ts + (300 * granularity))
+
+        try:
+            # Make the API request
+            headers = {
+                'Content-Type': 'application/json',
+                'User-Agent': 'Python/CoinbaseDataFetcher'
+            }
+
+            response = self.session.get(endpoint, params=params, headers=headers)
+            response.raise_for_status()
+
+            # Parse the response
+            data = response.json()
+
+            # Extract candles from response
+            if 'candles' in data:
+                candles = data['candles']
+            else:
+                return None
+
+            return decode_candles(candles)
+
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching data: {e}")
+            return None
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+            return None
+
+    def fetch_candles(self, start_time=None, end_time=None, granularity=300, limit=300):
+        """
+        Fetch historical candles data from Coinbase Advanced Trade API as a DataFrame.
+        """
+        candles = self.fetch_candle_array(start_time, end_time, granularity, limit)
+        if candles is None:
+            return None
+        return candles_to_frame(candles)
+
+    def plan_windows(self, start_date, end_date, granularity=300):
+        """
+        Split a date range into consecutive windows of at most 300 candles.
+        """
+        batch_timedelta = timedelta(seconds=300 * granularity)
+
+        windows = []
+        current_start = start_date
+        while current_start < end_date:
+            current_end = min(current_start + batch_timedelta, end_date)
+            windows.append((current_start, current_end))
+            current_start = current_end
+
+        return windows
+
+    def request_budget(self):
+        """
+        Requests/second the shared rate limiter currently allows for Coinbase.
+        """
+        limiter = transport.rate_limiter
+        return limiter.budget(self.base_url) if hasattr(limiter, "budget") else float("inf")
+
+    def fetch_window(self, window, granularity, max_retries=3):
+        """
+        Fetch a single window with retries. Pacing is done by the transport's rate limiter.
+        Returns (window, CANDLE_DTYPE array or None).
+        """
+        start, end = window
+
+        for attempt in range(max_retries):
+            candles = self.fetch_candle_array(start, end, granularity)
+
+            if candles is not None:
+                return window, candles
+
+            if attempt < max_retries - 1:
+                time.sleep(2)
+
+        return window, None
+
+    def checkpoint_store(self, granularity):
+        """
+        Checkpoint store for this product and granularity.
+        """
+        label = GRANULARITY_LABELS.get(granularity, f"{granularity}s")
+        return CandleCheckpointStore(os.path.join(self.checkpoint_dir, f"{self.file_prefix}_{label}_checkpoint"))
+
+    def covered_log(self, granularity):
+        """
+        Log of the windows Coinbase has answered for this product and granularity.
+        """
+        label = GRANULARITY_LABELS.get(granularity, f"{granularity}s")
+        return CoveredWindowLog(os.path.join(self.checkpoint_dir, f"{self.file_prefix}_{label}_covered.jsonl"))
+
+    def plan_missing_windows(self, existing_ts, start_date, end_date, granularity=300, covered=None):
+        """
+        Compute the minimal set of <=300-candle API windows covering every slot of the
+        expected grid between start_date and end_date that has no candle yet.
+        `existing_ts` holds the candle start times already stored, as Unix seconds.
+
+        Missing slots are found with one vectorised set difference against the grid,
+        then covered greedily: each window starts at the first uncovered missing slot
+        and is trimmed to end right after the last missing slot it covers.
+
+        Coinbase omits candles for intervals with no trades, so slots inside a window
+        already answered (`covered`, a CoveredWindowLog) are known to be empty upstream
+        and are not planned again.
+        """
+        # Grid in the same epoch convention fetch_candles uses for its parameters
+        start_ts = utc_seconds(start_date)
+        start_ts += -start_ts % granularity
+        end_ts = utc_seconds(end_date)
+        grid = np.arange(start_ts, end_ts, granularity, dtype=np.int64)
+
+        missing = np.setdiff1d(grid, existing_ts)
+        if covered is not None:
+            missing = missing[~covered.covered(missing)]
+
+        windows = []
+        i = 0
+        while i < len(missing):
+            window_start = missing[i]
+            # First missing slot beyond this window's 300-candle reach
+            j = np.searchsorted(missing, window_start + 300 * granularity, side="left")
+            window_end = missing[j - 1] + granularity
+            windows.append((from_utc_seconds(window_start), from_utc_seconds(window_end)))
+            i = j
+
+        return missing, windows
+
+    def fetch_windows(self, windows, granularity, store, max_workers=8):
+        """
+        Fetch the given windows over a bounded thread pool and append each finished
+        window to the checkpoint store, including windows Coinbase answered with no
+        candles. All workers share the fetcher's rate limiter so the combined request
+        rate stays inside the Coinbase public budget.
+
+        Answered windows also go to the covered-window log, up to the last candle
+        that was already closed when it was fetched, so later updates skip their
+        empty slots.
+
+        Returns the list of windows that failed after all retries.
+        """
+        failed_requests = []
+        num_requests = len(windows)
+        covered = self.covered_log(granularity)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # executor.map yields results in submission order, i.e. timestamp order
+            results = executor.map(lambda window: self.fetch_window(window, granularity), windows)
+
+            for done, (window, candles) in enumerate(results, start=1):
+                if candles is None:
+                    failed_requests.append(window)
+                else:
+                    store.append(window, candles)
+                    start_ts, end_ts = store.window_key(window)
+                    closed = (int(time.time()) // granularity - 1) * granularity
+                    covered.add(start_ts, min(end_ts, closed))
+
+                if done % 100 == 0 or done == num_requests:
+                    print(f"Progress: {done / num_requests * 100:.1f}% | Request {done}/{num_requests} | "
+                          f"Up to {window[1].strftime('%Y-%m-%d %H:%M')}")
+
+        return failed_requests
+
+    def finalize_fetch(self, store, failed_requests, granularity, existing_df=None):
+        """
+        Combine checkpointed segments (plus any existing data), report failures and
+        clear the checkpoint if every window succeeded.
+        """
+        label = GRANULARITY_LABELS.get(granularity, f"{granularity}s")
+
+        candles = store.load()
+        if candles is None and existing_df is None:
+            print("No data was fetched")
+            return None
+
+        print(f"\n{'='*60}")
+        print("FINALIZING DATA...")
+
+        combined_df = None
+        if candles is not None:
+            # Deduplicate and sort in NumPy, then convert to pandas exactly once
+            _, first = np.unique(candles['timestamp'], return_index=True)
+            combined_df = candles_to_frame(candles[first])
+
+        if existing_df is not None:
+            frames = [frame for frame in (existing_df, combined_df) if frame is not None]
+            combined_df = pd.concat(frames, ignore_index=True)
+            combined_df = combined_df.drop_duplicates(subset=['timestamp'], keep='last')
+            combined_df = combined_df.sort_values('timestamp')
+            combined_df = combined_df.reset_index(drop=True)
+
+        print(f"Total candles: {len(combined_df):,}")
+
+        # Report failed requests
+        if failed_requests:
+            print(f"\nWarning: {len(failed_requests)} requests failed")
+            fail_file = f"{self.file_prefix}_{label}_failed_requests.txt"
+            with open(fail_file, 'w') as f:
+                for start, end in failed_requests:
+                    f.write(f"{start},{end}\n")
+            print(f"Failed requests saved to {fail_file}")
+            print("Checkpoint kept - run again to retry only the failed windows")
+        else:
+            # Clean up checkpoint
+            store.clear()
+
+        return combined_df
+
+    def fetch_complete_historical_data(self, start_date, end_date, granularity=300, max_workers=8):
+        """
+        Fetch complete historical data by fanning the 300-candle windows out over a
+        bounded thread pool.
+
+        Each finished window is appended to the checkpoint store as its own segment.
+        On resume, windows already listed in the store's manifest are skipped, and
+        failed windows are left out of it so the next run retries them.
+        """
+
+        # Convert string dates to datetime if needed
+        if isinstance(start_date, str):
+            start_date = datetime.strptime(start_date, "%Y-%m-%d")
+        if isinstance(end_date, str):
+            end_date = datetime.strptime(end_date, "%Y-%m-%d")
+
+        store = self.checkpoint_store(granularity)
+
+        # Skip windows that an earlier run already checkpointed
+        completed = store.completed_windows()
+        windows = self.plan_windows(start_date, end_date, granularity)
+        windows = [w for w in windows if store.window_key(w) not in completed]
+        num_requests = len(windows)
+
+        if completed:
+            print(f"\nFound existing checkpoint: {store.directory}")
+            print(f"Already have {len(completed):,} windows ({store.total_rows():,} candles)")
+
+        print(f"="*60)
+        print(f"FETCHING HISTORICAL DATA: {self.product_id}")
+        print(f"="*60)
+        print(f"Date range: {start_date.date()} to {end_date.date()}")
+        print(f"Granularity: {granularity/60} minutes")
+        print(f"Requests needed: {num_requests:,}")
+        print(f"Workers: {max_workers} | Rate limit: {self.request_budget()} requests/sec")
+        print(f"Estimated time: {(num_requests / self.request_budget() / 60):.1f} minutes")
+        print(f"="*60)
+
+        failed_requests = self.fetch_windows(windows, granularity, store, max_workers)
+
+        return self.finalize_fetch(store, failed_requests, granularity)
+
+    def update_historical_data(self, existing, start_date, end_date, granularity=300, max_workers=8):
+        """
+        Bring an existing dataset up to date by fetching only the missing candle slots.
+
+        `existing` is a DataFrame or a path to a previously saved dataset. Holes anywhere
+        in the series (including windows that failed in earlier runs) and any new data
+        after the last stored candle are planned with plan_missing_windows, so a nightly
+        re-run only costs the requests needed to fill them.
+        """
+
+        # Convert string dates to datetime if needed
+        if isinstance(start_date, str):
+            start_date = datetime.strptime(start_date, "%Y-%m-%d")
+        if isinstance(end_date, str):
+            end_date = datetime.strptime(end_date, "%Y-%m-%d")
+
+        if isinstance(existing, str):
+            print(f"\nLoading existing dataset: {existing}")
+            existing = storage.read_table(existing, parse_dates=['timestamp'])
+            existing['timestamp'] = pd.to_datetime(existing['timestamp'])
+
+        store = self.checkpoint_store(granularity)
+        checkpointed = store.load()
+
+        # Slots already covered by the dataset or by an interrupted update
+        have = existing['timestamp'].to_numpy(dtype='datetime64[s]').astype(np.int64)
+        if checkpointed is not None:
+            have = np.concatenate([have, checkpointed['timestamp']])
+
+        missing, windows = self.plan_missing_windows(have, start_date, end_date, granularity,
+                                                     covered=self.covered_log(granularity))
+
+        print(f"="*60)
+        print(f"UPDATING HISTORICAL DATA: {self.product_id}")
+        print(f"="*60)
+        print(f"Date range: {start_date.date()} to {end_date.date()}")
+        print(f"Existing candles: {len(existing):,}")
+        print(f"Missing slots: {len(missing):,}")
+        print(f"Requests needed: {len(windows):,}")
+        print(f"="*60)
+
+        failed_requests = self.fetch_windows(windows, granularity, store, max_workers)
+
+        return self.finalize_fetch(store, failed_requests, granularity, existing_df=existing)
+
+    def fetch_daily_historical_data(self, start_date, end_date):
+        """
+        Fetch complete DAILY historical data for the date range.
+        Much faster than 5-minute data since we need fewer requests.
+        """
+        df = self.fetch_complete_historical_data(start_date, end_date, granularity=86400)
+
+        if df is not None:
+            # Add date column for easier analysis
+            df['date'] = df['timestamp'].dt.date
+
+        return df
+
+    def dataset_file(self, start_date, end_date, granularity=300):
+        """
+        Name of the main dataset file for a requested date range (naive dates are UTC).
+        Built from the request, not from the candles, so an update run finds the file
+        again even when the edge windows had no candles.
+        """
+        label = GRANULARITY_LABELS.get(granularity, f"{granularity}s")
+        return f"{self.file_prefix}_{label}_complete_{start_date:%Y%m%d}_{end_date:%Y%m%d}.csv"
+
+    def write_dataset_files(self, df, granularity=300, start_date=None, end_date=None):
+        """
+        Write the main file through common.storage (columnar, with a CSV export) and
+        merge the candles into the month-partitioned price store. The main file is
+        named after the requested range if given, else after the candles' range.
+        Returns the main file path.
+        """
+        if start_date is None or end_date is None:
+            start_date, end_date = df['timestamp'].min(), df['timestamp'].max()
+
+        main_file = storage.write_table(df, self.dataset_file(start_date, end_date, granularity))
+        print(f"Main file saved: {main_file}")
+        print(f"File size: {os.path.getsize(main_file) / (1024*1024):.2f} MB")
+
+        # Partitioned store replaces the old yearly splits; query it with price_store.load()
+        try:
+            partitions = self.price_store.write(self.product_id, df, granularity)
+            print(f"Price store updated: {partitions} monthly partitions under {self.price_store.root}")
+        except ImportError as e:
+            print(f"Price store skipped: {e}")
+
+        return main_file
+
+    def save_complete_dataset(self, df, granularity=300, start_date=None, end_date=None):
+        """
+        Save the complete dataset with multiple output formats. Pass the requested
+        start_date/end_date so the main file gets the name dataset_file() expects.
+        """
+        if df is None or df.empty:
+            print("No data to save")
+            return
+
+        print("\n" + "="*60)
+        print(f"SAVING COMPLETE {self.asset} DATASET")
+        print("="*60)
+
+        self.write_dataset_files(df, granularity, start_date, end_date)
+
+        # Summary statistics
+        print("\n" + "="*60)
+        print(f"{self.asset} DATASET SUMMARY")
+        print("="*60)
+        print(f"Total candles: {len(df):,}")
+        print(f"Date range: {df['timestamp'].min()} to {df['timestamp'].max()}")
+        print(f"\n{self.asset} Price Journey:")
+        print(f"  Start ({df['timestamp'].iloc[0].date()}): ${df['close'].iloc[0]:,.2f}")
+        print(f"  End ({df['timestamp'].iloc[-1].date()}): ${df['close'].iloc[-1]:,.2f}")
+        print(f"  All-time High: ${df['high'].max():,.2f}")
+        print(f"  All-time Low: ${df['low'].min():,.2f}")
+
+        # Data completeness
+        time_range = (df['timestamp'].max() - df['timestamp'].min()).total_seconds()
+        expected_candles = time_range / granularity
+        completeness = (len(df) / expected_candles) * 100
+        print(f"\nData completeness: {completeness:.1f}%")
+
+    def save_daily_dataset(self, df):
+        """
+        Save the daily dataset with analysis-ready features
+        """
+        if df is None or df.empty:
+            print("No data to save")
+            return
+
+        print("\n" + "="*60)
+        print(f"SAVING DAILY {self.asset} DATASET")
+        print("="*60)
+
+        # Add useful columns for analysis
+        df['returns'] = df['close'].pct_change()
+        df['log_returns'] = np.log(df['close'] / df['close'].shift(1))
+        df['range'] = df['high'] - df['low']
+        df['range_pct'] = (df['high'] - df['low']) / df['close'] * 100
+        df['intraday_volatility'] = df['range_pct']  # Proxy for daily volatility
+
+        self.write_dataset_files(df, granularity=86400)
+
+        # Summary statistics
+        print("\n" + "="*60)
+        print(f"DAILY {self.asset} DATASET SUMMARY")
+        print("="*60)
+        print(f"Total trading days: {len(df)}")
+        print(f"Date range: {df['timestamp'].min().date()} to {df['timestamp'].max().date()}")
+
+        print(f"\nPrice Statistics:")
+        print(f"  Start ({df['timestamp'].iloc[0].date()}): ${df['close'].iloc[0]:,.2f}")
+        print(f"  End ({df['timestamp'].iloc[-1].date()}): ${df['close'].iloc[-1]:,.2f}")
+        print(f"  All-time High: ${df['high'].max():,.2f}")
+        print(f"  All-time Low: ${df['low'].min():,.2f}")
+        print(f"  Average Close: ${df['close'].mean():,.2f}")
+
+        print(f"\nVolatility Metrics:")
+        print(f"  Daily Returns Std Dev: {df['returns'].std()*100:.2f}%")
+        print(f"  Annualized Volatility: {df['returns'].std()*np.sqrt(365)*100:.2f}%")
+        print(f"  Max Daily Gain: {df['returns'].max()*100:.2f}%")
+        print(f"  Max Daily Loss: {df['returns'].min()*100:.2f}%")
+
+        print(f"\nKey {self.asset} Events in Dataset:")
+        # Find biggest moves
+        df_sorted_gains = df.nlargest(5, 'returns')[['date', 'close', 'returns']]
+        df_sorted_losses = df.nsmallest(5, 'returns')[['date', 'close', 'returns']]
+
+        print("\nTop 5 Daily Gains:")
+        for _, row in df_sorted_gains.iterrows():
+            print(f"  {row['date']}: +{row['returns']*100:.2f}% (${row['close']:,.2f})")
+
+        print("\nTop 5 Daily Losses:")
+        for _, row in df_sorted_losses.iterrows():
+            print(f"  {row['date']}: {row['returns']*100:.2f}% (${row['close']:,.2f})")
+
+        # Calculate rolling volatility for the paper
+        print("\nCalculating rolling 30-day volatility...")
+        df['volatility_30d'] = df['returns'].rolling(window=30).std() * np.sqrt(365)
+        df['volatility_30d_pct'] = df['volatility_30d'] * 100
+
+        # Save enhanced version with volatility
+        enhanced_file = f"{self.file_prefix}_daily_with_volatility.csv"
+        enhanced_file = storage.write_table(df, enhanced_file)
+        print(f"\nEnhanced file with volatility saved: {enhanced_file}")
+
+        return df
+
+
+def backfill_products(products, start_date, end_date, granularity=300, max_workers=8,
+                      requests_per_second=None, checkpoint_dir="."):
+    """
+    Backfill several products in one run. All fetchers share the pooled Coinbase session
+    and its rate limiter, so connections are reused across products and the combined
+    request rate stays inside the Coinbase budget. `requests_per_second` overrides the
+    limiter's Coinbase ceiling.
+
+    Returns {product_id: DataFrame} for every product that returned data.
+    """
+    session = transport.get_session(BASE_URL)
+    if requests_per_second is not None:
+        transport.rate_limiter.set_budget(urlsplit(BASE_URL).netloc, requests_per_second)
+
+    results = {}
+    for product_id in products:
+        fetcher = CoinbaseCandleFetcher(
+            product_id,
+            session=session,
+            checkpoint_dir=checkpoint_dir
+        )
+
+        df = fetcher.fetch_complete_historical_data(
+            start_date,
+            end_date,
+            granularity=granularity,
+            max_workers=max_workers
+        )
+
+        if df is not None:
+            fetcher.save_complete_dataset(df, granularity, start_date, end_date)
+            results[product_id] = df
+
+    return results
+
+
+# Main execution
+if __name__ == "__main__":
+    # Define date range (UTC)
+    start_date = datetime(2019, 11, 1, 0, 0, 0)    # Nov 1, 2019
+    end_date = datetime(2025, 8, 2, 23, 59, 59)     # Aug 2, 2025
+
+    print("="*60)
+    print("COINBASE MULTI-PRODUCT CANDLE FETCHER")
+    print("="*60)
+    print(f"Products: {', '.join(PRODUCTS)}")
+    print(f"Fetching 5-minute candles from Nov 2019 to Aug 2025")
+    print("="*60)
+
+    results = backfill_products(PRODUCTS, start_date, end_date, granularity=300)
+
+    print("\n" + "="*60)
+    print("MULTI-PRODUCT BACKFILL COMPLETE")
+    print("="*60)
+    for product_id in PRODUCTS:
+        if product_id in results:
+            print(f"  {product_id}: {len(results[product_id]):,} candles")
+        else:
+            print(f"  {product_id}: no data")
@@ -0,0 +1,201 @@
+"""
+Date-partitioned candle store with memory-mapped range queries.
+
+Candles are kept as one uncompressed Arrow IPC file per product, granularity and
+calendar month:
+
+    price_store/btc_usd/300s/2023/03.arrow
+
+Opening a partition memory-maps it, so a query only pages in the months it
+touches and the numeric columns are used in place without a copy. An event study
+on the March 2023 USDC depeg reads a single 5-minute partition instead of the
+whole 2019-2025 file:
+
+    from Crypto_Price_Data.price_store import load
+    df = load("BTC-USD", "2023-03-09", "2023-03-16", granularity=300)
+
+Requires pyarrow (pip install pyarrow); without it the store raises ImportError
+when used, and the Coinbase fetchers skip it and keep writing their main files.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+DEFAULT_ROOT = "price_store"
+
+# Columns stored per candle; derived columns (returns, volatility...) are recomputed
+CANDLE_COLUMNS = ['timestamp', 'low', 'high', 'open', 'close', 'volume']
+
+
+def to_epoch_seconds(value):
+    """
+    Datetime, date string or pandas Timestamp -> Unix seconds (naive values are UTC).
+    """
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return int(ts.value // 10**9)
+
+
+class PriceStore:
+    """
+    Year/month partitioned Arrow IPC files for any number of products and granularities.
+
+    Timestamps are stored as int64 Unix seconds (candle start, UTC) and every partition
+    is kept sorted, so range queries slice each partition with a binary search.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def require_pyarrow():
+        if pa is None:
+            raise ImportError("the price store needs pyarrow (pip install pyarrow)")
+
+    @staticmethod
+    def product_dir(product_id):
+        # e.g. "BTC-USD" -> "btc_usd", matching the fetchers' file prefixes
+        return product_id.lower().replace("-", "_")
+
+    def partition_path(self, product_id, granularity, year, month):
+        return os.path.join(self.root, self.product_dir(product_id), f"{granularity}s",
+                            str(year), f"{month:02d}.arrow")
+
+    def partitions(self, product_id, granularity):
+        """
+        Sorted (year, month) pairs stored for a product and granularity.
+        """
+        base = os.path.join(self.root, self.product_dir(product_id), f"{granularity}s")
+        if not os.path.isdir(base):
+            return []
+
+        found = []
+        for year in os.listdir(base):
+            for name in os.listdir(os.path.join(base, year)):
+                if name.endswith(".arrow"):
+                    found.append((int(year), int(name[:-len(".arrow")])))
+        return sorted(found)
+
+    def read_partition(self, path):
+        """
+        Memory-map one partition and return it as an Arrow table.
+        """
+        source = pa.memory_map(path, "r")
+        return pa.ipc.open_file(source).read_all()
+
+    def write_partition(self, path, table):
+        """
+        Write a partition to a temporary file and move it into place.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with pa.OSFile(tmp, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+
+    def write(self, product_id, df, granularity=300):
+        """
+        Merge candles into the store. `df` needs the CANDLE_COLUMNS, with `timestamp`
+        as datetimes; other columns are ignored. Candles already stored for the same
+        timestamp are replaced, so re-writing a range is idempotent.
+
+        Returns the number of partitions written.
+        """
+        if df is None or df.empty:
+            return 0
+        self.require_pyarrow()
+
+        ts = df['timestamp'].to_numpy(dtype='datetime64[s]')
+        seconds = ts.astype(np.int64)
+        months = ts.astype('datetime64[M]')
+
+        written = 0
+        with self.lock:
+            for month in np.unique(months):
+                mask = months == month
+                year, month_num = int(str(month)[:4]), int(str(month)[5:7])
+                path = self.partition_path(product_id, granularity, year, month_num)
+
+                columns = {'timestamp': seconds[mask]}
+                for name in CANDLE_COLUMNS[1:]:
+                    columns[name] = df[name].to_numpy(dtype=np.float64)[mask]
+                new = pa.table(columns)
+
+                if os.path.exists(path):
+                    # Read fully (not mapped) so the file can be replaced below
+                    with pa.OSFile(path, "rb") as source:
+                        old = pa.ipc.open_file(source).read_all()
+                    new = pa.concat_tables([old, new])
+
+                # Sort and keep the last copy of each timestamp
+                stamps = new.column('timestamp').to_numpy()
+                order = np.argsort(stamps, kind='stable')
+                stamps = stamps[order]
+                keep = np.append(stamps[1:] != stamps[:-1], True)
+                new = new.take(pa.array(order[keep]))
+
+                self.write_partition(path, new)
+                written += 1
+
+        return written
+
+    def load_table(self, product_id, start, end, granularity=300):
+        """
+        Candles with start <= timestamp < end as an Arrow table, touching only the
+        partitions that overlap the range.
+        """
+        self.require_pyarrow()
+        start_ts = to_epoch_seconds(start)
+        end_ts = to_epoch_seconds(end)
+
+        first = np.datetime64(start_ts, 's').astype('datetime64[M]')
+        last = np.datetime64(end_ts - 1, 's').astype('datetime64[M]')
+
+        tables = []
+        for month in np.arange(first, last + 1):
+            year, month_num = int(str(month)[:4]), int(str(month)[5:7])
+            path = self.partition_path(product_id, granularity, year, month_num)
+            if not os.path.exists(path):
+                continue
+
+            table = self.read_partition(path)
+            stamps = table.column('timestamp').to_numpy()
+            lo = np.searchsorted(stamps, start_ts, side='left')
+            hi = np.searchsorted(stamps, end_ts, side='left')
+            if hi > lo:
+                tables.append(table.slice(lo, hi - lo))
+
+        if not tables:
+            return None
+        return pa.concat_tables(tables)
+
+    def load(self, product_id, start, end, granularity=300):
+        """
+        Candles with start <= timestamp < end as a DataFrame in the usual output layout,
+        or None if the store has nothing in that range.
+        """
+        table = self.load_table(product_id, start, end, granularity)
+        if table is None:
+            return None
+
+        df = table.to_pandas()
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+        return df
+
+
+def load(product_id, start, end, granularity=300, root=DEFAULT_ROOT):
+    """
+    Range query against the default store, e.g. load("ETH-USD", "2022-09-14", "2022-09-16").
+    """
+    return PriceStore(root).load(product_id, start, end, granularity)
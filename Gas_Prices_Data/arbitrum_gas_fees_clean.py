@@ -1,8 +1,12 @@
 import pandas as pd
-from datetime import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common import storage
 
 # Import your CSV file
-df = pd.read_csv(r"C:\Users\hello\OneDrive\Desktop\Wrapped Stablecoins\Gas_Prices_Data\arbitrum_gas_fees_arbriscan.csv")
+df = storage.read_table(r"C:\Users\hello\OneDrive\Desktop\Wrapped Stablecoins\Gas_Prices_Data\arbitrum_gas_fees_arbriscan.csv")
 
 # Remove quotes from column names
 df.columns = df.columns.str.replace('"', '')
@@ -23,6 +27,6 @@ new_df = pd.DataFrame({'Date(UTC)': date_range})
 result = pd.merge(new_df, df, on='Date(UTC)', how='left')
 
 # Save cleaned file without quotes
-result.to_csv('cleaned_data.csv', index=False)
+storage.write_table(result, 'cleaned_data.csv')
 
 print("Done! All quotes removed and dates filled.")
\ No newline at end of file
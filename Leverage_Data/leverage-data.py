@@ -1,23 +1,48 @@
-import requests
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import time
+from datetime import datetime, timedelta, timezone
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common import storage, transport
+
+def as_utc(dt):
+    """
+    Naive UTC datetime. Binance timestamps are stored naive in UTC, so every date
+    here is naive UTC; aware datetimes are converted.
+    """
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+def utc_ms(dt):
+    """
+    Milliseconds since the epoch for a naive UTC (or aware) datetime.
+    datetime.timestamp() alone would read a naive value as local time.
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
 
 class BinanceHourlyHistoricalData:
     """
     Get hourly historical leverage data from Binance (2020-2025)
     """
     
-    def __init__(self):
+    def __init__(self, store_dir="leverage_store"):
         self.spot_base = "https://api.binance.com/api/v3"
         self.futures_base = "https://fapi.binance.com/fapi/v1"
         self.futures_data = "https://fapi.binance.com/futures/data"
         
-        # Define date range
+        # Define date range (naive UTC, like the stored timestamps)
         self.start_date = datetime(2020, 1, 1)
         self.end_date = datetime(2025, 8, 2)
         
+        # Raw metric streams per symbol, kept across runs for incremental updates
+        self.store_dir = store_dir
+        
     def get_hourly_klines(self, symbol='BTCUSDT', start_date=None, end_date=None):
         """
         Get hourly OHLCV data for entire period
@@ -27,27 +52,31 @@ class BinanceHourlyHistoricalData:
             start_date = self.start_date
         if end_date is None:
             end_date = self.end_date
+        start_date, end_date = as_utc(start_date), as_utc(end_date)
             
         url = f"{self.spot_base}/klines"
         
         all_klines = []
         current_start = start_date
+        # Only candles opening before end_date, so the still-open hour is never stored
+        end_ms = utc_ms(end_date) - 1
         
         while current_start < end_date:
             # Convert to milliseconds
-            start_ms = int(current_start.timestamp() * 1000)
+            start_ms = utc_ms(current_start)
             
             params = {
                 'symbol': symbol,
                 'interval': '1h',  # HOURLY interval
                 'startTime': start_ms,
+                'endTime': end_ms,
                 'limit': 1000  # Max allowed (1000 hours = ~41 days)
             }
             
             print(f"Fetching {symbol} hourly from {current_start.date()}...")
             
             try:
-                response = requests.get(url, params=params)
+                response = transport.get(url, params=params)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -76,9 +105,9 @@ class BinanceHourlyHistoricalData:
                     else:
                         break
                         
-                elif response.status_code == 429:
-                    print("Rate limited, waiting 60 seconds...")
-                    time.sleep(60)
+                elif response.status_code in (418, 429):
+                    # The shared rate limiter pauses this endpoint for the server's Retry-After
+                    print("Rate limited, retrying after server-requested backoff...")
                     continue
                 else:
                     print(f"Error: {response.status_code}")
@@ -87,9 +116,6 @@ class BinanceHourlyHistoricalData:
             except Exception as e:
                 print(f"Exception: {e}")
                 break
-            
-            # Small delay to avoid rate limits
-            time.sleep(0.5)
         
         if all_klines:
             df = pd.DataFrame(all_klines)
@@ -99,21 +125,27 @@ class BinanceHourlyHistoricalData:
         
         return None
     
-    def get_hourly_open_interest(self, symbol='BTCUSDT'):
+    def get_hourly_open_interest(self, symbol='BTCUSDT', start_date=None, end_date=None):
         """
         Get hourly open interest data
         """
+        if start_date is None:
+            start_date = self.start_date
+        if end_date is None:
+            end_date = self.end_date
+        start_date, end_date = as_utc(start_date), as_utc(end_date)
+        
         url = f"{self.futures_data}/openInterestHist"
         
         all_oi_data = []
-        current_date = self.start_date
+        current_date = start_date
         
         # Process in chunks of 20 days (480 hours per chunk)
-        while current_date < self.end_date:
-            end_chunk = min(current_date + timedelta(days=20), self.end_date)
+        while current_date < end_date:
+            end_chunk = min(current_date + timedelta(days=20), end_date)
             
-            start_ms = int(current_date.timestamp() * 1000)
-            end_ms = int(end_chunk.timestamp() * 1000)
+            start_ms = utc_ms(current_date)
+            end_ms = utc_ms(end_chunk)
             
             params = {
                 'symbol': symbol,
@@ -126,7 +158,7 @@ class BinanceHourlyHistoricalData:
             print(f"Fetching hourly OI from {current_date.date()} to {end_chunk.date()}...")
             
             try:
-                response = requests.get(url, params=params)
+                response = transport.get(url, params=params)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -142,9 +174,9 @@ class BinanceHourlyHistoricalData:
                     else:
                         print(f"  No data available")
                         
-                elif response.status_code == 429:
-                    print("Rate limited, waiting...")
-                    time.sleep(60)
+                elif response.status_code in (418, 429):
+                    # The shared rate limiter pauses this endpoint for the server's Retry-After
+                    print("Rate limited, retrying after server-requested backoff...")
                     continue
                 else:
                     print(f"  Error: {response.status_code}")
@@ -153,7 +185,6 @@ class BinanceHourlyHistoricalData:
                 print(f"  Exception: {e}")
             
             current_date = end_chunk
-            time.sleep(1)
         
         if all_oi_data:
             df = pd.DataFrame(all_oi_data)
@@ -163,15 +194,21 @@ class BinanceHourlyHistoricalData:
         
         return None
     
-    def get_hourly_funding_rates(self, symbol='BTCUSDT'):
+    def get_hourly_funding_rates(self, symbol='BTCUSDT', start_date=None, end_date=None):
         """
         Get funding rates and align to hourly
         Note: Funding is every 8 hours, we'll forward fill to hourly
         """
+        if start_date is None:
+            start_date = self.start_date
+        if end_date is None:
+            end_date = self.end_date
+        start_date, end_date = as_utc(start_date), as_utc(end_date)
+        
         url = f"{self.futures_base}/fundingRate"
         
         all_funding = []
-        end_time = int(self.end_date.timestamp() * 1000)
+        end_time = utc_ms(end_date)
         
         while True:
             params = {
@@ -183,7 +220,7 @@ class BinanceHourlyHistoricalData:
             print(f"Fetching funding rates before {pd.to_datetime(end_time, unit='ms').date()}...")
             
             try:
-                response = requests.get(url, params=params)
+                response = transport.get(url, params=params)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -192,25 +229,30 @@ class BinanceHourlyHistoricalData:
                         for item in data:
                             funding_time = pd.to_datetime(item['fundingTime'], unit='ms')
                             
-                            if funding_time < self.start_date:
-                                break
+                            # Batches are oldest first, so skip (not stop at) rates before the window
+                            if funding_time < start_date:
+                                continue
                                 
                             all_funding.append({
                                 'timestamp': funding_time,
                                 'funding_rate': float(item['fundingRate'])
                             })
                         
-                        oldest_time = pd.to_datetime(data[-1]['fundingTime'], unit='ms')
+                        oldest_time = pd.to_datetime(data[0]['fundingTime'], unit='ms')
                         print(f"  Got {len(data)} funding rates, oldest: {oldest_time.date()}")
                         
-                        if oldest_time <= self.start_date or len(data) < 1000:
+                        if oldest_time <= start_date or len(data) < 1000:
                             break
                             
-                        end_time = int(oldest_time.timestamp() * 1000) - 1
+                        end_time = utc_ms(oldest_time) - 1
                         
                     else:
                         break
                         
+                elif response.status_code in (418, 429):
+                    # The shared rate limiter pauses this endpoint for the server's Retry-After
+                    print("Rate limited, retrying after server-requested backoff...")
+                    continue
                 else:
                     print(f"Error: {response.status_code}")
                     break
@@ -218,17 +260,15 @@ class BinanceHourlyHistoricalData:
             except Exception as e:
                 print(f"Exception: {e}")
                 break
-            
-            time.sleep(1)
         
         if all_funding:
             df = pd.DataFrame(all_funding)
-            df = df[df['timestamp'] >= self.start_date]
+            df = df[df['timestamp'] >= start_date]
             df = df.drop_duplicates(subset=['timestamp']).sort_values('timestamp')
             
             # Resample to hourly (forward fill)
             df = df.set_index('timestamp')
-            hourly_funding = df.resample('1H').ffill()
+            hourly_funding = df.resample('1h').ffill()
             hourly_funding = hourly_funding.reset_index()
             
             print(f"Total hourly funding rates: {len(hourly_funding)} points")
@@ -236,21 +276,27 @@ class BinanceHourlyHistoricalData:
         
         return None
     
-    def get_hourly_long_short_ratio(self, symbol='BTCUSDT'):
+    def get_hourly_long_short_ratio(self, symbol='BTCUSDT', start_date=None, end_date=None):
         """
         Get hourly long/short ratio
         """
+        if start_date is None:
+            start_date = self.start_date
+        if end_date is None:
+            end_date = self.end_date
+        start_date, end_date = as_utc(start_date), as_utc(end_date)
+        
         url = f"{self.futures_data}/globalLongShortAccountRatio"
         
         all_ls_data = []
-        current_date = self.start_date
+        current_date = start_date
         
         # Process in chunks
-        while current_date < self.end_date:
-            end_chunk = min(current_date + timedelta(days=20), self.end_date)
+        while current_date < end_date:
+            end_chunk = min(current_date + timedelta(days=20), end_date)
             
-            start_ms = int(current_date.timestamp() * 1000)
-            end_ms = int(end_chunk.timestamp() * 1000)
+            start_ms = utc_ms(current_date)
+            end_ms = utc_ms(end_chunk)
             
             params = {
                 'symbol': symbol,
@@ -263,7 +309,7 @@ class BinanceHourlyHistoricalData:
             print(f"Fetching hourly L/S ratio from {current_date.date()} to {end_chunk.date()}...")
             
             try:
-                response = requests.get(url, params=params)
+                response = transport.get(url, params=params)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -278,11 +324,15 @@ class BinanceHourlyHistoricalData:
                             })
                         print(f"  Got {len(data)} hourly L/S points")
                         
+                elif response.status_code in (418, 429):
+                    # The shared rate limiter pauses this endpoint for the server's Retry-After
+                    print("  Rate limited, retrying after server-requested backoff...")
+                    continue
+                        
             except Exception as e:
                 print(f"  Error: {e}")
             
             current_date = end_chunk
-            time.sleep(1)
         
         if all_ls_data:
             df = pd.DataFrame(all_ls_data)
@@ -292,20 +342,26 @@ class BinanceHourlyHistoricalData:
         
         return None
     
-    def get_hourly_taker_volume(self, symbol='BTCUSDT'):
+    def get_hourly_taker_volume(self, symbol='BTCUSDT', start_date=None, end_date=None):
         """
         Get hourly taker buy/sell volume
         """
+        if start_date is None:
+            start_date = self.start_date
+        if end_date is None:
+            end_date = self.end_date
+        start_date, end_date = as_utc(start_date), as_utc(end_date)
+        
         url = f"{self.futures_data}/takerlongshortRatio"
         
         all_taker_data = []
-        current_date = self.start_date
+        current_date = start_date
         
-        while current_date < self.end_date:
-            end_chunk = min(current_date + timedelta(days=20), self.end_date)
+        while current_date < end_date:
+            end_chunk = min(current_date + timedelta(days=20), end_date)
             
-            start_ms = int(current_date.timestamp() * 1000)
-            end_ms = int(end_chunk.timestamp() * 1000)
+            start_ms = utc_ms(current_date)
+            end_ms = utc_ms(end_chunk)
             
             params = {
                 'symbol': symbol,
@@ -318,7 +374,7 @@ class BinanceHourlyHistoricalData:
             print(f"Fetching hourly taker volume from {current_date.date()} to {end_chunk.date()}...")
             
             try:
-                response = requests.get(url, params=params)
+                response = transport.get(url, params=params)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -333,11 +389,15 @@ class BinanceHourlyHistoricalData:
                             })
                         print(f"  Got {len(data)} hourly taker points")
                         
+                elif response.status_code in (418, 429):
+                    # The shared rate limiter pauses this endpoint for the server's Retry-After
+                    print("  Rate limited, retrying after server-requested backoff...")
+                    continue
+                        
             except Exception as e:
                 print(f"  Error: {e}")
             
             current_date = end_chunk
-            time.sleep(1)
         
         if all_taker_data:
             df = pd.DataFrame(all_taker_data)
@@ -347,17 +407,64 @@ class BinanceHourlyHistoricalData:
         
         return None
     
-    def combine_hourly_data(self, symbol='BTCUSDT'):
+    def metric_fetchers(self):
         """
-        Combine all hourly data for a symbol
+        Metric streams joined into the hourly panel, in join order. Prices come from the
+        spot API and the rest from separate futures endpoints, each with its own limit.
         """
-        print(f"\n{'='*60}")
-        print(f"Processing {symbol} - HOURLY DATA")
-        print('='*60)
+        return {
+            'prices': self.get_hourly_klines,
+            'open_interest': self.get_hourly_open_interest,
+            'funding': self.get_hourly_funding_rates,
+            'long_short': self.get_hourly_long_short_ratio,
+            'taker': self.get_hourly_taker_volume,
+        }
+    
+    def fetch_all_metrics(self, symbols, max_workers=None, start_dates=None, end_date=None):
+        """
+        Fetch every metric stream for every symbol concurrently.
         
-        # 1. Get hourly prices
-        print("\n1. Fetching hourly prices...")
-        prices = self.get_hourly_klines(symbol)
+        Each (symbol, metric) pair is one work unit on a shared thread pool. Pacing is
+        left to the transport's rate limiter, which keeps a separate budget per endpoint
+        (spot klines, fundingRate, futures/data), so slow endpoints do not hold up the
+        others. `start_dates` optionally maps (symbol, metric) to the first hour to fetch;
+        streams default to self.start_date. Returns {symbol: {metric: DataFrame or None}}.
+        """
+        fetchers = self.metric_fetchers()
+        if max_workers is None:
+            max_workers = len(symbols) * len(fetchers)
+        if start_dates is None:
+            start_dates = {}
+        if end_date is None:
+            end_date = self.end_date
+        
+        results = {symbol: {} for symbol in symbols}
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(fetch, symbol, start_dates.get((symbol, metric), self.start_date), end_date): (symbol, metric)
+                for symbol in symbols
+                for metric, fetch in fetchers.items()
+            }
+            
+            for future in as_completed(futures):
+                symbol, metric = futures[future]
+                try:
+                    results[symbol][metric] = future.result()
+                except Exception as e:
+                    print(f"Error fetching {metric} for {symbol}: {e}")
+                    results[symbol][metric] = None
+                
+                status = "ok" if results[symbol][metric] is not None else "no data"
+                print(f"  Finished {symbol} {metric}: {status}")
+        
+        return results
+    
+    def join_hourly_data(self, symbol, metrics):
+        """
+        Join the fetched metric streams for one symbol onto its hourly price index
+        """
+        prices = metrics.get('prices')
         
         if prices is None:
             print(f"Failed to get price data for {symbol}")
@@ -366,33 +473,22 @@ class BinanceHourlyHistoricalData:
         # Use prices as base
         df = prices.set_index('timestamp')
         
-        # 2. Get hourly OI
-        print("\n2. Fetching hourly Open Interest...")
-        oi = self.get_hourly_open_interest(symbol)
-        if oi is not None:
-            oi = oi.set_index('timestamp')
-            df = df.join(oi[['open_interest', 'open_interest_usd']], how='left')
-        
-        # 3. Get funding rates (resampled to hourly)
-        print("\n3. Fetching funding rates...")
-        funding = self.get_hourly_funding_rates(symbol)
-        if funding is not None:
-            funding = funding.set_index('timestamp')
-            df = df.join(funding[['funding_rate']], how='left')
-        
-        # 4. Get L/S ratio
-        print("\n4. Fetching hourly Long/Short ratio...")
-        ls_ratio = self.get_hourly_long_short_ratio(symbol)
-        if ls_ratio is not None:
-            ls_ratio = ls_ratio.set_index('timestamp')
-            df = df.join(ls_ratio[['longShortRatio', 'longAccount', 'shortAccount']], how='left')
-        
-        # 5. Get taker volume
-        print("\n5. Fetching hourly taker volume...")
-        taker = self.get_hourly_taker_volume(symbol)
-        if taker is not None:
-            taker = taker.set_index('timestamp')
-            df = df.join(taker[['buySellRatio', 'buyVol', 'sellVol']], how='left')
+        # Columns taken from each stream
+        columns = {
+            'open_interest': ['open_interest', 'open_interest_usd'],
+            'funding': ['funding_rate'],
+            'long_short': ['longShortRatio', 'longAccount', 'shortAccount'],
+            'taker': ['buySellRatio', 'buyVol', 'sellVol'],
+        }
+        
+        # Single join of every available stream
+        others = [
+            metrics[metric].set_index('timestamp')[cols]
+            for metric, cols in columns.items()
+            if metrics.get(metric) is not None
+        ]
+        if others:
+            df = df.join(others, how='left')
         
         # Calculate additional metrics
         df['symbol'] = symbol
@@ -411,7 +507,72 @@ class BinanceHourlyHistoricalData:
         
         return df
     
-    def run_complete_collection(self):
+    def stream_path(self, symbol, metric):
+        """
+        Persistent table holding one raw metric stream for one symbol (stored in the
+        common.storage format; the .csv name is only the dataset's base name)
+        """
+        return os.path.join(self.store_dir, f"{symbol}_{metric}.csv")
+    
+    def load_stream(self, symbol, metric):
+        """
+        Load a stored metric stream, or None if it has not been collected yet
+        """
+        path = self.stream_path(symbol, metric)
+        if storage.find_table(path) is None:
+            return None
+        
+        df = storage.read_table(path, parse_dates=['timestamp'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        return df
+    
+    def last_stored_hour(self, symbol, metric):
+        """
+        Latest timestamp stored for a metric stream, or None if there is none
+        """
+        df = self.load_stream(symbol, metric)
+        if df is None or df.empty:
+            return None
+        return df['timestamp'].max().to_pydatetime()
+    
+    def merge_stream(self, symbol, metric, new_data):
+        """
+        Merge newly fetched rows into the stored stream and write it back.
+        
+        Rows are keyed by timestamp and fetched rows replace stored ones, so merging
+        the same data twice leaves the store unchanged. storage.write_table replaces the
+        file atomically, so an interrupted run never leaves a truncated stream behind.
+        """
+        stored = self.load_stream(symbol, metric)
+        frames = [df for df in (stored, new_data) if df is not None]
+        if not frames:
+            return None
+        
+        df = pd.concat(frames, ignore_index=True)
+        df = df.drop_duplicates(subset=['timestamp'], keep='last').sort_values('timestamp')
+        
+        if metric == 'funding':
+            # Funding is forward-filled to hourly; refill across the seam between runs
+            df = df.set_index('timestamp').resample('1h').ffill().reset_index()
+        
+        os.makedirs(self.store_dir, exist_ok=True)
+        storage.write_table(df, self.stream_path(symbol, metric), csv_export=False)
+        
+        return df
+    
+    def combine_hourly_data(self, symbol='BTCUSDT'):
+        """
+        Combine all hourly data for a symbol
+        """
+        print(f"\n{'='*60}")
+        print(f"Processing {symbol} - HOURLY DATA")
+        print('='*60)
+        
+        metrics = self.fetch_all_metrics([symbol])[symbol]
+        
+        return self.join_hourly_data(symbol, metrics)
+    
+    def run_complete_collection(self, symbols=None, max_workers=None):
         """
         Collect all hourly data for multiple symbols
         """
@@ -419,11 +580,21 @@ class BinanceHourlyHistoricalData:
         print("COLLECTING HOURLY HISTORICAL DATA (2020-2025)")
         print("="*60)
         
-        symbols = ['BTCUSDT', 'ETHUSDT']  # Add more if needed
+        if symbols is None:
+            symbols = ['BTCUSDT', 'ETHUSDT']  # Add more if needed
         all_data = {}
         
+        # All metric streams for all symbols in parallel, then one join per symbol
+        print(f"\nFetching {len(self.metric_fetchers())} metric streams for {len(symbols)} symbols concurrently...")
+        fetched = self.fetch_all_metrics(symbols, max_workers)
+        
         for symbol in symbols:
-            df = self.combine_hourly_data(symbol)
+            # Seed the persistent store so later runs can update incrementally
+            for metric, data in fetched[symbol].items():
+                if data is not None:
+                    self.merge_stream(symbol, metric, data)
+            
+            df = self.join_hourly_data(symbol, fetched[symbol])
             
             if df is not None:
                 all_data[symbol] = df
@@ -431,7 +602,7 @@ class BinanceHourlyHistoricalData:
                 # Save individual symbol data
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                 filename = f'{symbol}_hourly_2020_2025_{timestamp}.csv'
-                df.to_csv(filename, index=False)
+                filename = storage.write_table(df, filename)
                 print(f"\nSaved {symbol} to {filename}")
                 
                 # Print summary
@@ -449,15 +620,12 @@ class BinanceHourlyHistoricalData:
                     funding_data = df['funding_rate'].dropna()
                     if len(funding_data) > 0:
                         print(f"  Avg funding: {funding_data.mean()*100:.4f}%")
-            
-            # Wait between symbols
-            time.sleep(2)
         
         # Combine all symbols
         if all_data:
             combined = pd.concat(all_data.values(), ignore_index=True)
             combined_file = f'all_symbols_hourly_2020_2025_{timestamp}.csv'
-            combined.to_csv(combined_file, index=False)
+            combined_file = storage.write_table(combined, combined_file)
             
             print("\n" + "="*60)
             print("COLLECTION COMPLETE")
@@ -482,14 +650,75 @@ class BinanceHourlyHistoricalData:
                     ls_completeness = (symbol_data['longShortRatio'].notna().sum() / len(symbol_data)) * 100
                     print(f"  L/S data completeness: {ls_completeness:.1f}%")
 
+    def update_collection(self, symbols=None, end_date=None, max_workers=None):
+        """
+        Bring the stored hourly streams up to date.
+        
+        For every symbol and metric only the hours after the last stored one are
+        fetched (streams with nothing stored yet start at self.start_date), merged into
+        the persistent store, and the panel is rebuilt from the store. Re-running with
+        no new data changes nothing, so the update can be scheduled freely.
+        """
+        if symbols is None:
+            symbols = ['BTCUSDT', 'ETHUSDT']  # Add more if needed
+        if end_date is None:
+            end_date = datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+        
+        print("\n" + "="*60)
+        print(f"UPDATING HOURLY DATA THROUGH {end_date}")
+        print("="*60)
+        
+        # Resume each stream after its last stored hour
+        start_dates = {}
+        for symbol in symbols:
+            for metric in self.metric_fetchers():
+                last_hour = self.last_stored_hour(symbol, metric)
+                if last_hour is not None:
+                    start_dates[(symbol, metric)] = last_hour + timedelta(hours=1)
+                    print(f"  {symbol} {metric}: stored through {last_hour}")
+                else:
+                    print(f"  {symbol} {metric}: nothing stored, fetching from {self.start_date.date()}")
+        
+        fetched = self.fetch_all_metrics(symbols, max_workers, start_dates, end_date)
+        
+        all_data = {}
+        for symbol in symbols:
+            streams = {}
+            for metric in self.metric_fetchers():
+                new_data = fetched[symbol].get(metric)
+                new_rows = 0 if new_data is None else len(new_data)
+                streams[metric] = self.merge_stream(symbol, metric, new_data)
+                print(f"  {symbol} {metric}: {new_rows} new rows")
+            
+            df = self.join_hourly_data(symbol, streams)
+            
+            if df is not None:
+                all_data[symbol] = df
+                filename = f'{symbol}_hourly.csv'
+                filename = storage.write_table(df, filename)
+                print(f"Saved {symbol} to {filename}")
+        
+        if all_data:
+            combined = pd.concat(all_data.values(), ignore_index=True)
+            combined_file = 'all_symbols_hourly.csv'
+            combined_file = storage.write_table(combined, combined_file)
+            print(f"\nTotal combined data: {len(combined)} hourly rows")
+            print(f"Saved to: {combined_file}")
+        
+        return all_data
+
 # MAIN EXECUTION
 if __name__ == "__main__":
     
     # Initialize
     collector = BinanceHourlyHistoricalData()
     
-    # Run complete collection
-    collector.run_complete_collection()
+    if os.path.isdir(collector.store_dir):
+        # Earlier run found - only fetch hours after the last stored one
+        collector.update_collection()
+    else:
+        # Run complete collection
+        collector.run_complete_collection()
     
     print("\n" + "="*60)
     print("HOURLY DATA COLLECTION COMPLETE")
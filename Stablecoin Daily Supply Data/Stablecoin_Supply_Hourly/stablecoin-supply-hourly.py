@@ -1,7 +1,11 @@
 import requests
 import pandas as pd
 from datetime import datetime, timezone
-import time
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common import storage, transport
 
 def fetch_stablecoin_list():
     """
@@ -11,7 +15,7 @@ def fetch_stablecoin_list():
     
     try:
         print("Fetching stablecoin list to get IDs...")
-        response = requests.get(url, timeout=30)
+        response = transport.get(url, timeout=30)
         response.raise_for_status()
         data = response.json()
         
@@ -65,7 +69,7 @@ def fetch_stablecoin_data(stablecoin_id, name):
     
     try:
         print(f"Fetching data for {name} (ID: {stablecoin_id}) from: {url}")
-        response = requests.get(url, timeout=60)  # Longer timeout for large datasets
+        response = transport.get(url, timeout=60)  # Longer timeout for large datasets
         response.raise_for_status()
         
         # Check if response has content
@@ -153,8 +157,6 @@ def main():
             df = fetch_stablecoin_data(coin_id, coin_name)
             if not df.empty:
                 all_dfs.append(df)
-            # Add a small delay to be respectful to the API
-            time.sleep(2)
         else:
             print(f"Could not find ID for {coin_name}")
     
@@ -168,9 +170,8 @@ def main():
         # Reset index
         combined_df = combined_df.reset_index(drop=True)
         
-        # Save to CSV
-        output_file = 'hourly_stablecoin_supply.csv'
-        combined_df.to_csv(output_file, index=False)
+        # Save (columnar file plus CSV export)
+        output_file = storage.write_table(combined_df, 'hourly_stablecoin_supply.csv')
         print(f"\nData saved to {output_file}")
         
         # Print summary statistics
@@ -1,5 +1,9 @@
 import pandas as pd
-from datetime import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common import storage
 
 def create_clean_long_format_csv(input_filename='area-chart-data-2025-08-04.csv', 
                                 output_filename='stablecoins_2020_2025_long.csv'):
@@ -13,7 +17,7 @@ def create_clean_long_format_csv(input_filename='area-chart-data-2025-08-04.csv'
     print("=" * 60)
     
     # Read the CSV
-    df = pd.read_csv(input_filename)
+    df = storage.read_table(input_filename)
     
     # Convert Date column to datetime
     df['Date'] = pd.to_datetime(df['Date'])
@@ -50,8 +54,8 @@ def create_clean_long_format_csv(input_filename='area-chart-data-2025-08-04.csv'
     # Sort by date and stablecoin for better organization
     long_df = long_df.sort_values(['Date', 'Stablecoin']).reset_index(drop=True)
     
-    # Save to CSV
-    long_df.to_csv(output_filename, index=False)
+    # Save (columnar file plus CSV export)
+    storage.write_table(long_df, output_filename)
     
     print(f"\nSaved to: {output_filename}")
     print(f"Total rows: {len(long_df):,}")
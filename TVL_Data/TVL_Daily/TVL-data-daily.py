@@ -1,54 +1,108 @@
-import requests
+import numpy as np
 import pandas as pd
-from datetime import datetime
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common import storage
+from common.http_cache import ResponseCache
 
 # List of chains you need
 chains = ['ethereum', 'arbitrum', 'optimism', 'polygon', 'avalanche', 'bsc']
 
-# Store all data
-all_chain_data = []
+# Date range kept in the outputs (inclusive)
+START_DATE = '2020-01-01'
+END_DATE = '2025-08-02'
+
+# Chains fetched at once; pacing is left to the transport's DeFiLlama rate limiter
+MAX_WORKERS = 8
+
+# Chain histories are kept here between runs and revalidated with ETag/Last-Modified,
+# so a re-run only downloads the chains whose history changed
+cache = ResponseCache("http_cache")
 
-# Get data for each chain
-for chain in chains:
-    print(f"Fetching data for {chain}...")
-    
+
+def fetch_chain(chain):
+    """
+    Fetch one chain's daily TVL history as typed columns.
+    Returns (UTC day numbers since the epoch, TVL values, served from cache).
+    """
     # API endpoint for historical chain TVL
     url = f"https://api.llama.fi/v2/historicalChainTvl/{chain}"
-    
-    try:
-        response = requests.get(url)
-        data = response.json()
-        
-        # Add chain name to each record
-        for record in data:
-            all_chain_data.append({
-                'date': datetime.fromtimestamp(record['date']).strftime('%Y-%m-%d'),
-                'chain': chain,
-                'tvl': record['tvl']
-            })
-        
-        print(f" Got {len(data)} days of data for {chain}")
-        
-    except Exception as e:
-        print(f"✗ Error fetching {chain}: {e}")
-    
-    # Be nice to their free API
-    time.sleep(0.5)
-
-# Convert to DataFrame
-df = pd.DataFrame(all_chain_data)
-
-# Filter for your date range (2020-2025)
-df['date'] = pd.to_datetime(df['date'])
-df = df[(df['date'] >= '2020-01-01') & (df['date'] <= '2025-08-02')]
-
-# Pivot to wide format (optional - makes it easier to use)
-df_wide = df.pivot(index='date', columns='chain', values='tvl')
-df_wide.reset_index(inplace=True)
-
-# Save both formats
-df.to_csv('chain_tvl_historical_long.csv', index=False)
-df_wide.to_csv('chain_tvl_historical_wide.csv', index=False)
-
-print(f"\nTotal records: {len(df)}")
\ No newline at end of file
+
+    response = cache.get(url, timeout=60)
+    response.raise_for_status()
+    data = response.json()
+
+    # Straight from the JSON array into int64/float64 vectors, no per-record objects
+    count = len(data)
+    days = np.fromiter((record['date'] for record in data), dtype=np.int64, count=count) // 86400
+    tvl = np.fromiter((record['tvl'] for record in data), dtype=np.float64, count=count)
+
+    return days, tvl, response.from_cache
+
+
+def day_number(date):
+    """
+    'YYYY-MM-DD' -> days since the Unix epoch.
+    """
+    return int(np.datetime64(date, 'D').astype(np.int64))
+
+
+# Get data for all chains concurrently
+print(f"Fetching data for {len(chains)} chains...")
+chain_columns = {}
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+    futures = {executor.submit(fetch_chain, chain): chain for chain in chains}
+
+    for future in as_completed(futures):
+        chain = futures[future]
+        try:
+            days, tvl, from_cache = future.result()
+        except Exception as e:
+            print(f"✗ Error fetching {chain}: {e}")
+            continue
+
+        chain_columns[chain] = (days, tvl)
+        source = "unchanged, from cache" if from_cache else "downloaded"
+        print(f" Got {len(days)} days of data for {chain} ({source})")
+
+print(f"{cache.hits}/{len(chains)} chains unchanged since the last run")
+
+# One columnar buffer for all chains, in the configured chain order:
+# day number, chain code (index into `fetched`) and TVL per row
+fetched = [chain for chain in chains if chain in chain_columns]
+days = np.concatenate([chain_columns[chain][0] for chain in fetched] or [np.empty(0, np.int64)])
+tvl = np.concatenate([chain_columns[chain][1] for chain in fetched] or [np.empty(0)])
+codes = np.concatenate([np.full(len(chain_columns[chain][0]), i, dtype=np.int32)
+                        for i, chain in enumerate(fetched)] or [np.empty(0, np.int32)])
+
+# Filter for your date range (2020-2025) on the day numbers
+keep = (days >= day_number(START_DATE)) & (days <= day_number(END_DATE))
+days, tvl, codes = days[keep], tvl[keep], codes[keep]
+
+# Long format: one row per (date, chain)
+df = pd.DataFrame({
+    'date': days.astype('datetime64[D]').astype('datetime64[us]'),
+    'chain': np.asarray(fetched, dtype=object)[codes],
+    'tvl': tvl
+})
+
+# Wide format from the same buffer: scatter TVL into a date x chain matrix,
+# chains in alphabetical order as a pivot would give them
+unique_days, rows = np.unique(days, return_inverse=True)
+wide_chains = sorted(fetched)
+columns = np.array([wide_chains.index(chain) for chain in fetched], dtype=np.int32)[codes]
+
+matrix = np.full((len(unique_days), len(wide_chains)), np.nan)
+matrix[rows, columns] = tvl
+
+df_wide = pd.DataFrame(matrix, columns=wide_chains)
+df_wide.insert(0, 'date', unique_days.astype('datetime64[D]').astype('datetime64[us]'))
+
+# Save both formats (columnar files plus CSV exports)
+storage.write_table(df, 'chain_tvl_historical_long.csv')
+storage.write_table(df_wide, 'chain_tvl_historical_wide.csv')
+
+print(f"\nTotal records: {len(df)}")
@@ -1,9 +1,26 @@
-# pip install requests pandas python-dateutil rapidfuzz
+# pip install requests numpy pandas python-dateutil rapidfuzz  (optional: ijson)
+import io
+import json
+import os
+import sys
+import time
+from array import array
 import requests
+import urllib3
+import numpy as np
 import pandas as pd
 from datetime import timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from rapidfuzz import process, fuzz
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common import storage, transport
+
 START = "2020-01-01"
 END   = "2025-08-02"
 
@@ -12,40 +29,288 @@ WANTED = ["aave", "compound", "makerdao"]
 
 BASE = "https://api.llama.fi"
 
-def get_protocol_catalog():
-    r = requests.get(f"{BASE}/protocols", timeout=60)
-    r.raise_for_status()
-    cat = r.json()
-    # map slug -> full object, and also name->slug for matching
-    by_slug = {p["slug"]: p for p in cat if "slug" in p}
-    names = {p.get("name",""): p["slug"] for p in cat if "slug" in p}
-    return by_slug, names
-
-def resolve_slug(wanted, by_slug, names, score_cut=75):
-    # Exact slug
-    if wanted in by_slug:
-        return wanted
-    # Exact name
-    if wanted in names:
-        return names[wanted]
-    # Fuzzy over slugs + names
-    choices = list(by_slug.keys()) + list(names.keys())
-    match, score, _ = process.extractOne(wanted, choices, scorer=fuzz.token_sort_ratio)
-    if score >= score_cut:
-        # if match is a name, map to slug
-        return names.get(match, match)
+# Protocols downloaded at once; pacing is left to the transport's DeFiLlama rate limiter
+MAX_WORKERS = 8
+
+# Parse /protocol/{slug} payloads incrementally (needs ijson), keeping only the TVL series
+STREAM_JSON = os.getenv("STREAM_JSON", "1") == "1"
+
+# The /protocols list is thousands of entries; keep the slug/name pairs on disk and
+# only download it again once the copy is older than CATALOG_TTL seconds
+CATALOG_CACHE = os.getenv("PROTOCOL_CATALOG_CACHE", "protocol_catalog.json")
+CATALOG_TTL = int(os.getenv("PROTOCOL_CATALOG_TTL", "86400"))
+
+def normalize_name(text):
+    """'Maker-DAO ' -> 'makerdao': case, spacing and punctuation ignored."""
+    return "".join(ch for ch in text.casefold() if ch.isalnum())
+
+def sort_tokens(text):
+    """The form token_sort_ratio compares: casefolded, whitespace tokens in order."""
+    return " ".join(sorted(text.casefold().split()))
+
+def bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+class ProtocolIndex:
+    """
+    Slug lookup over the protocol catalog, built once and reused for every name.
+
+    resolve() tries, in order: exact slug, exact name, normalised slug/name
+    (normalize_name), then a fuzzy match. The fuzzy stage only scores candidates
+    whose length can reach the score cut (ratio <= 200 * shorter / combined length)
+    and, for queries longer than SHORT_QUERY characters, that share a character
+    bigram with the query. Bigram blocking is a heuristic (fuzz.ratio("ab", "axb")
+    is 80 with no shared bigram), so short queries skip it and a query with no match
+    in its block is scored against every length-compatible choice. A choice sharing
+    no bigram can still lose to a weaker one in the block that clears the cut.
+    Choices are pre-tokenised, so each query is one rapidfuzz call over a short list.
+    """
+
+    # Queries this short are scored against every length-compatible choice
+    SHORT_QUERY = 3
+
+    def __init__(self, protocols):
+        self.by_slug = {}
+        self.by_name = {}
+        self.normalized = {}
+        # token-sorted choice -> slug; names win over slugs with the same text
+        choices = {}
+
+        for p in protocols:
+            slug, name = p["slug"], p.get("name") or ""
+            self.by_slug[slug] = p
+            choices.setdefault(sort_tokens(slug), slug)
+            if name:
+                self.by_name[name] = slug
+                choices[sort_tokens(name)] = slug
+
+        for slug in self.by_slug:
+            self.normalized.setdefault(normalize_name(slug), slug)
+        for name, slug in self.by_name.items():
+            self.normalized.setdefault(normalize_name(name), slug)
+
+        self.choices = np.array(list(choices), dtype=object)
+        self.choice_slugs = list(choices.values())
+        self.lengths = np.array([len(choice) for choice in self.choices])
+
+        # Blocking index: bigram -> positions in self.choices
+        blocks = {}
+        for i, choice in enumerate(self.choices):
+            for gram in bigrams(choice):
+                blocks.setdefault(gram, []).append(i)
+        self.blocks = {gram: np.array(positions) for gram, positions in blocks.items()}
+
+    def __len__(self):
+        return len(self.by_slug)
+
+    def candidates(self, query, score_cut, blocked=True):
+        """
+        Positions of the choices whose length can reach `score_cut` against `query`,
+        narrowed to those sharing a bigram with it when `blocked`.
+        """
+        cut = score_cut / 100
+        keep = ((self.lengths >= len(query) * cut / (2 - cut))
+                & (self.lengths <= len(query) * (2 - cut) / cut))
+
+        if blocked and len(query) > self.SHORT_QUERY:
+            shared = np.zeros(len(self.choices), dtype=bool)
+            for gram in bigrams(query):
+                if gram in self.blocks:
+                    shared[self.blocks[gram]] = True
+            keep &= shared
+        return np.flatnonzero(keep)
+
+    def best_match(self, query, positions, score_cut):
+        """
+        Slug of the best-scoring choice among `positions`, or None below `score_cut`.
+        """
+        if not len(positions):
+            return None
+        match = process.extractOne(query, self.choices[positions].tolist(),
+                                   scorer=fuzz.ratio, score_cutoff=score_cut)
+        if match is None:
+            return None
+        return self.choice_slugs[positions[match[2]]]
+
+    def resolve(self, wanted, score_cut=75):
+        if wanted in self.by_slug:
+            return wanted
+        if wanted in self.by_name:
+            return self.by_name[wanted]
+        slug = self.normalized.get(normalize_name(wanted))
+        if slug:
+            return slug
+
+        query = sort_tokens(wanted)
+        positions = self.candidates(query, score_cut)
+        slug = self.best_match(query, positions, score_cut)
+        if slug is None:
+            # Nothing in the block clears the cut: score the choices it left out too
+            everything = self.candidates(query, score_cut, blocked=False)
+            if len(everything) > len(positions):
+                slug = self.best_match(query, everything, score_cut)
+        return slug
+
+def load_catalog_cache(path=CATALOG_CACHE):
+    """
+    Cached (fetched_at, protocols), or None if there is no readable cache.
+    """
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+        return cached["fetched_at"], cached["protocols"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def save_catalog_cache(protocols, path=CATALOG_CACHE):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"fetched_at": time.time(), "protocols": protocols}, f)
+    os.replace(tmp, path)
+
+def get_protocol_catalog(ttl=CATALOG_TTL, path=CATALOG_CACHE):
+    """
+    ProtocolIndex over the DeFiLlama catalog, from the on-disk copy while it is
+    younger than `ttl` seconds. A stale copy is still used if the refresh fails.
+    """
+    cached = load_catalog_cache(path)
+    if cached and time.time() - cached[0] < ttl:
+        print(f"[INFO] Protocol catalog from {path} ({len(cached[1])} protocols)")
+        return ProtocolIndex(cached[1])
+
+    try:
+        r = transport.get(f"{BASE}/protocols", timeout=60)
+        r.raise_for_status()
+        cat = r.json()
+    except requests.RequestException as e:
+        if not cached:
+            raise
+        print(f"[WARN] Catalog refresh failed ({e}); using the stale copy in {path}")
+        return ProtocolIndex(cached[1])
+
+    # Only slug and name are needed for matching
+    protocols = [{"slug": p["slug"], "name": p.get("name", "")} for p in cat if "slug" in p]
+    save_catalog_cache(protocols, path)
+    return ProtocolIndex(protocols)
+
+def resolve_slug(wanted, index, score_cut=75):
+    return index.resolve(wanted, score_cut)
+
+# Point fields holding the TVL, in the order normalize_points prefers them
+VALUE_KEYS = ("totalLiquidityUSD", "tvl", "tvlUsd")
+
+def classify_prefix(prefix):
+    """
+    Where an ijson event prefix sits in a protocol payload:
+      (series, None)   a point of a wanted series ("tvl.item", "chainTvls.X.tvl.item")
+      (series, field)  a scalar inside such a point ("tvl.item.date")
+      None             anything else (tokens, tokensInUsd, metadata, ...)
+    The series is None for the protocol total, else the chain name.
+    """
+    if prefix.startswith("tvl.item"):
+        series, rest = None, prefix[len("tvl.item"):]
+    elif prefix.startswith("chainTvls."):
+        # chainTvls: { chain: { tvl: [points], ... } }  OR  { chain: [points] }
+        series, sep, rest = prefix[len("chainTvls."):].partition(".tvl.item")
+        if not sep:
+            series, sep, rest = prefix[len("chainTvls."):].partition(".item")
+            if not sep or "." in series:
+                return None
+    else:
+        return None
+
+    if rest == "":
+        return series, None
+    if rest.startswith(".") and "." not in rest[1:]:
+        return series, rest[1:]
+    return None
+
+def point_value(point):
+    for key in VALUE_KEYS:
+        if key in point:
+            return point[key]
+    # fall back to a likely numeric field
+    for key, value in point.items():
+        if key != "date":
+            return value
     return None
 
+def parse_protocol_stream(stream):
+    """
+    Pull the protocol and per-chain TVL series out of a /protocol/{slug} JSON stream.
+
+    Only the scalars inside `tvl` and `chainTvls.*.tvl` points become Python
+    objects; everything else (token breakdowns etc.) is skipped as it streams past.
+    Returns the payload's shape with each series as typed columns,
+    {"date": int64 array, "totalLiquidityUSD": float64 array}, which normalize_points
+    accepts like a list of points.
+    """
+    series = {}
+    kinds = {}
+    point = {}
+
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        try:
+            kind = kinds[prefix]
+        except KeyError:
+            kind = kinds[prefix] = classify_prefix(prefix)
+        if kind is None:
+            continue
+
+        name, field = kind
+        if field is not None:
+            if event == "number":
+                point[field] = value
+        elif event == "start_map":
+            point = {}
+        elif event == "end_map":
+            date, tvl = point.get("date"), point_value(point)
+            if date is not None and tvl is not None:
+                dates, values = series.setdefault(name, (array("q"), array("d")))
+                dates.append(int(date))
+                values.append(tvl)
+
+    def columns(name):
+        dates, values = series[name]
+        return {"date": np.frombuffer(dates, dtype=np.int64),
+                "totalLiquidityUSD": np.frombuffer(values, dtype=np.float64)}
+
+    payload = {"chainTvls": {name: {"tvl": columns(name)} for name in series if name is not None}}
+    if None in series:
+        payload["tvl"] = columns(None)
+    return payload
+
 def fetch_protocol(slug):
     url = f"{BASE}/protocol/{slug}"
-    r = requests.get(url, timeout=60)
-    r.raise_for_status()
-    return r.json()
+    if ijson is None or not STREAM_JSON:
+        r = transport.get(url, timeout=60)
+        r.raise_for_status()
+        return r.json()
+
+    r = transport.get(url, timeout=60, stream=True)
+    with r:
+        r.raise_for_status()
+        if r.raw is None:
+            # Already buffered (HTTP/2 session)
+            stream = io.BytesIO(r.content)
+        else:
+            r.raw.decode_content = True
+            stream = r.raw
+        # Surface broken streams as requests errors, like r.json() would
+        try:
+            return parse_protocol_stream(stream)
+        except urllib3.exceptions.HTTPError as e:
+            raise requests.exceptions.ChunkedEncodingError(str(e))
+        except ijson.JSONError as e:
+            raise requests.exceptions.InvalidJSONError(f"{slug}: {e}")
 
 def normalize_points(points):
     """Return DataFrame with datetime,tvl_usd from a list/dict points."""
     if isinstance(points, list):
         df = pd.DataFrame(points)
+    elif isinstance(points, dict) and "date" in points:
+        # typed columns from parse_protocol_stream
+        df = pd.DataFrame(points)
     elif isinstance(points, dict) and "tvl" in points:
         df = pd.DataFrame(points["tvl"])
     else:
@@ -85,12 +350,42 @@ def hourlyize(df, start=START, end=END, fill="ffill"):
     out.index.name = "datetime"
     return out.reset_index()
 
+def protocol_frames(slug):
+    """
+    Download one protocol and turn it into hourly frames straight away, so only
+    the (much smaller) hourly series outlive the raw payload.
+    Returns (total frame or None, [per-chain frames]).
+    """
+    j = fetch_protocol(slug)
+
+    # Protocol-level series; labels go on after hourlyize so the filled hours carry them too
+    df_total = None
+    if isinstance(j.get("tvl"), (list, dict)):
+        df_total = hourlyize(normalize_points(j["tvl"]))
+        df_total["protocol"] = slug
+
+    # Per-chain series can be:
+    # - chainTvls: { chainName: [points] }  OR
+    # - chainTvls: { chainName: { tvl: [points], tokenBreakdowns: ... } }
+    chain_frames = []
+    ctv = j.get("chainTvls")
+    if isinstance(ctv, dict):
+        for chain_name, payload in ctv.items():
+            df_chain = normalize_points(payload)
+            if not df_chain.empty:
+                df_chain = hourlyize(df_chain)
+                df_chain["protocol"] = slug
+                df_chain["chain"] = chain_name
+                chain_frames.append(df_chain)
+
+    return df_total, chain_frames
+
 def main():
-    by_slug, names = get_protocol_catalog()
+    index = get_protocol_catalog()
 
     resolved = []
     for want in WANTED:
-        slug = resolve_slug(want, by_slug, names)
+        slug = resolve_slug(want, index)
         if slug:
             print(f"[OK] {want}  slug: {slug}")
             resolved.append(slug)
@@ -100,44 +395,36 @@ def main():
     total_out = []
     chain_out = []
 
-    for slug in resolved:
-        try:
-            j = fetch_protocol(slug)
-        except requests.HTTPError as e:
-            print(f"[WARN] Fetch failed for {slug}: {e}")
-            continue
+    # At most MAX_WORKERS payloads in flight; each is hourlyized as soon as it lands
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {executor.submit(protocol_frames, slug): slug for slug in dict.fromkeys(resolved)}
+
+        for future in as_completed(futures):
+            slug = futures[future]
+            try:
+                df_total, chain_frames = future.result()
+            except requests.RequestException as e:
+                print(f"[WARN] Fetch failed for {slug}: {e}")
+                continue
 
-        # Protocol-level series
-        if isinstance(j.get("tvl"), list):
-            df_total = normalize_points(j["tvl"])
-            df_total["protocol"] = slug
-            total_out.append(hourlyize(df_total))
-
-        # Per-chain series can be:
-        # - chainTvls: { chainName: [points] }  OR
-        # - chainTvls: { chainName: { tvl: [points], tokenBreakdowns: ... } }
-        ctv = j.get("chainTvls")
-        if isinstance(ctv, dict):
-            for chain_name, payload in ctv.items():
-                df_chain = normalize_points(payload)
-                if not df_chain.empty:
-                    df_chain["protocol"] = slug
-                    df_chain["chain"] = chain_name
-                    chain_out.append(hourlyize(df_chain))
+            if df_total is not None:
+                total_out.append(df_total)
+            chain_out.extend(chain_frames)
+            print(f"[OK] {slug}: {len(chain_frames)} chains")
 
     if total_out:
         total_df = pd.concat(total_out, ignore_index=True)
         total_df = total_df[["datetime","protocol","tvl_usd"]].sort_values(["protocol","datetime"])
-        total_df.to_csv("tvl_hourly_total.csv", index=False)
-        print("Saved tvl_hourly_total.csv")
+        path = storage.write_table(total_df, "tvl_hourly_total.csv")
+        print(f"Saved {path}")
     else:
         print("[INFO] No protocol-level TVL rows collected.")
 
     if chain_out:
         chain_df = pd.concat(chain_out, ignore_index=True)
         chain_df = chain_df[["datetime","protocol","chain","tvl_usd"]].sort_values(["protocol","chain","datetime"])
-        chain_df.to_csv("tvl_hourly_by_chain.csv", index=False)
-        print("Saved tvl_hourly_by_chain.csv")
+        path = storage.write_table(chain_df, "tvl_hourly_by_chain.csv")
+        print(f"Saved {path}")
     else:
         print("[INFO] No per-chain TVL rows collected.")
 
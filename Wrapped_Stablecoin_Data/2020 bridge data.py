@@ -1,4 +1,13 @@
-# Save the provided text data as a CSV file
+# Save the provided text data as a dataset (columnar file plus CSV export)
+
+import io
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common import storage
 
 # Provided data as a string
 data = """DATETIME,ORIGIN_CHAIN,DESTINATION_CHAIN,TOKEN,BRIDGE_PROTOCOL,VOLUME_USD,TRANSACTION_COUNT
@@ -36263,9 +36272,10 @@ data = """DATETIME,ORIGIN_CHAIN,DESTINATION_CHAIN,TOKEN,BRIDGE_PROTOCOL,VOLUME_U
 2020-12-31 23:48:00,ethereum,gnosis,DAI,gnosis_xdai_bridge-v1,40.07,1
 2020-12-31 23:58:00,ethereum,gnosis,DAI,gnosis_xdai_bridge-v1,43.7,1
 """ 
-# Save as CSV
-# Save as "2020 bridge data.csv"
-with open("2020 bridge data.csv", "w", encoding="utf-8") as f:
-    f.write(data)
+# Parse once so the columnar copy keeps real datetime/float dtypes
+df = pd.read_csv(io.StringIO(data), parse_dates=['DATETIME'])
+
+# Save as "2020 bridge data" (Parquet plus "2020 bridge data.csv")
+path = storage.write_table(df, "2020 bridge data.csv")
 
-print("CSV file saved as '2020 bridge data.csv'")
+print(f"Data saved as '{path}' ({len(df):,} rows)")
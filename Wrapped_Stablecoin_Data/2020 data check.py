@@ -1,8 +1,12 @@
 # Quick one-liner to get unique bridge protocols
-import pandas as pd
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common import storage
 
 # Load your CSV
-df = pd.read_csv(r"C:\Users\hello\OneDrive\Desktop\Wrapped Stablecoins\Wrapped_Stablecoin_Data\2020 bridge data.csv")
+df = storage.read_table(r"C:\Users\hello\OneDrive\Desktop\Wrapped Stablecoins\Wrapped_Stablecoin_Data\2020 bridge data.csv", columns=['BRIDGE_PROTOCOL'])
 
 # Get unique protocols
 unique_protocols = df['BRIDGE_PROTOCOL'].unique()
@@ -0,0 +1,157 @@
+"""
+Locally cached timestamp <-> block index for one chain.
+
+Block headers are fetched lazily while binary-searching for the block that
+starts a time window, and every header seen is kept in a sorted on-disk cache
+(block_index/{chain}.json). Later lookups start from the tightest cached
+bracket, so resolving a window that was resolved before needs no requests, and
+nearby windows need only a handful.
+
+The index is independent of any API: it is given a function that returns a
+block's Unix timestamp and one that returns the chain head.
+"""
+
+import bisect
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+DEFAULT_DIR = "block_index"
+
+
+class BlockIndex:
+    """
+    Sorted (height, timestamp) pairs for one chain, searchable in both directions.
+
+    `get_timestamp(height)` returns the Unix timestamp of a block (or None on failure)
+    and `get_head()` the latest block height. `block_time` is the typical seconds per
+    block, used only to make the first guesses of a search land close.
+    """
+
+    def __init__(self, chain_name, get_timestamp, get_head, block_time=12.0, directory=DEFAULT_DIR):
+        self.chain_name = chain_name
+        self.get_timestamp = get_timestamp
+        self.get_head = get_head
+        self.block_time = block_time
+        self.path = os.path.join(directory, f"{chain_name}.json")
+        self.lock = threading.RLock()
+
+        self.heights = []
+        self.timestamps = []
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            pairs = json.load(f)
+        for height, ts in sorted(pairs):
+            self.heights.append(height)
+            self.timestamps.append(ts)
+
+    def save(self):
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(list(zip(self.heights, self.timestamps)), f)
+            os.replace(tmp, self.path)
+
+    def timestamp(self, height):
+        """
+        Unix timestamp of a block, from the cache or fetched and cached.
+        """
+        with self.lock:
+            i = bisect.bisect_left(self.heights, height)
+            if i < len(self.heights) and self.heights[i] == height:
+                return self.timestamps[i]
+
+        ts = self.get_timestamp(height)
+        if ts is None:
+            raise RuntimeError(f"Could not fetch block {height:,} on {self.chain_name}")
+
+        with self.lock:
+            i = bisect.bisect_left(self.heights, height)
+            if i == len(self.heights) or self.heights[i] != height:
+                self.heights.insert(i, height)
+                self.timestamps.insert(i, ts)
+        return ts
+
+    def bracket(self, target):
+        """
+        Cached blocks (lo, hi) with timestamp(lo) < target <= timestamp(hi), widened
+        with the genesis block or chain head when the cache does not reach that far.
+        hi is None if even the head is older than target.
+        """
+        with self.lock:
+            i = bisect.bisect_left(self.timestamps, target)
+            lo = self.heights[i - 1] if i > 0 else None
+            hi = self.heights[i] if i < len(self.heights) else None
+
+        if hi is None:
+            head = self.get_head()
+            if self.timestamp(head) < target:
+                return head, None
+            hi = head
+        if lo is None:
+            # Probe an estimate from the block clock before falling back to genesis
+            estimate = hi - int((self.timestamp(hi) - target) / self.block_time * 1.05) - 1
+            if 0 < estimate < hi and self.timestamp(estimate) < target:
+                lo = estimate
+            elif self.timestamp(0) >= target:
+                return None, 0
+            else:
+                lo = 0
+
+        return lo, hi
+
+    def first_block_at(self, when):
+        """
+        First block signed at or after `when` (a datetime or Unix timestamp).
+        Returns head + 1 if no block that late exists yet.
+        """
+        target = when.timestamp() if isinstance(when, datetime) else when
+
+        lo, hi = self.bracket(target)
+        if hi is None:
+            return lo + 1
+        if lo is None:
+            return hi
+
+        # Invariant: timestamp(lo) < target <= timestamp(hi)
+        step = 0
+        while hi - lo > 1:
+            ts_lo = self.timestamp(lo)
+            ts_hi = self.timestamp(hi)
+
+            if step % 2 == 0 and ts_hi > ts_lo:
+                # Interpolate on the block clock, then bisect on alternate steps
+                guess = lo + int((target - ts_lo) / (ts_hi - ts_lo) * (hi - lo))
+            else:
+                guess = (lo + hi) // 2
+            guess = min(max(guess, lo + 1), hi - 1)
+            step += 1
+
+            if self.timestamp(guess) < target:
+                lo = guess
+            else:
+                hi = guess
+
+        return hi
+
+    def block_range(self, start_dt, end_dt):
+        """
+        Exact (first, last) block heights signed in [start_dt, end_dt). The cache is
+        saved afterwards so the next run resolves the same window for free.
+        """
+        first = self.first_block_at(start_dt)
+        last = self.first_block_at(end_dt) - 1
+        self.save()
+        return first, last
+
+    def block_datetime(self, height):
+        """
+        UTC datetime at which a block was signed.
+        """
+        return datetime.fromtimestamp(self.timestamp(height), timezone.utc)
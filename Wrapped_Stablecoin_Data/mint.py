@@ -11,6 +11,15 @@ from datetime import datetime, timedelta, timezone
 from dateutil import parser as dtp
 from typing import Dict, List, Optional, Tuple
 import json
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common import storage, transport
+from common.rate_limit import DEFAULT_BUDGETS
+from Wrapped_Stablecoin_Data.block_index import BlockIndex
 
 # ------------------ CONFIG ------------------
 API_KEY = os.getenv("COVALENT_API_KEY", "cqt_rQ3HBRpwkwGrwdbTXjr3DGDdkyb4")
@@ -20,6 +29,14 @@ ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 # Transfer event signature (keccak256 of "Transfer(address,address,uint256)")
 TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
 
+# The zero address as an indexed topic (left-padded to 32 bytes)
+ZERO_TOPIC = "0x" + "0" * 64
+
+# Ask Covalent only for Transfer logs from the zero address (topic0 = Transfer,
+# topic1 = 0x0) and decode them from raw topics/data; set MINT_TOPIC_FILTER=0 to
+# fetch every event of the token and filter the decoded events instead
+USE_TOPIC_FILTER = os.getenv("MINT_TOPIC_FILTER", "1") == "1"
+
 # Wrapped tokens to track - using lowercase addresses for consistency
 TOKENS = [
     # Aave v2 (Ethereum)
@@ -106,151 +123,677 @@ TOKENS = [
         "wrapped_decimals": 18,
         "underlying_symbol": "DAI",
     },
+    # Aave v3 (Arbitrum) - v3 aTokens share their addresses across Arbitrum, Optimism and Polygon
+    {
+        "chain_id": 42161,
+        "chain_name": "arbitrum-mainnet",
+        "protocol": "AaveV3",
+        "wrapped_symbol": "aArbUSDC",
+        "wrapped_token_address": "0x625e7708f30ca75bfd92586e17077590c60eb4cd",
+        "wrapped_decimals": 6,
+        "underlying_symbol": "USDC",
+    },
+    {
+        "chain_id": 42161,
+        "chain_name": "arbitrum-mainnet",
+        "protocol": "AaveV3",
+        "wrapped_symbol": "aArbUSDT",
+        "wrapped_token_address": "0x6ab707aca953edaefbc4fd23ba73294241490620",
+        "wrapped_decimals": 6,
+        "underlying_symbol": "USDT",
+    },
+    {
+        "chain_id": 42161,
+        "chain_name": "arbitrum-mainnet",
+        "protocol": "AaveV3",
+        "wrapped_symbol": "aArbDAI",
+        "wrapped_token_address": "0x82e64f49ed5ec1bc6e43dad4fc8af9bb3a2312ee",
+        "wrapped_decimals": 18,
+        "underlying_symbol": "DAI",
+    },
+    # Aave v3 (Optimism)
+    {
+        "chain_id": 10,
+        "chain_name": "optimism-mainnet",
+        "protocol": "AaveV3",
+        "wrapped_symbol": "aOptUSDC",
+        "wrapped_token_address": "0x625e7708f30ca75bfd92586e17077590c60eb4cd",
+        "wrapped_decimals": 6,
+        "underlying_symbol": "USDC",
+    },
+    {
+        "chain_id": 10,
+        "chain_name": "optimism-mainnet",
+        "protocol": "AaveV3",
+        "wrapped_symbol": "aOptUSDT",
+        "wrapped_token_address": "0x6ab707aca953edaefbc4fd23ba73294241490620",
+        "wrapped_decimals": 6,
+        "underlying_symbol": "USDT",
+    },
+    {
+        "chain_id": 10,
+        "chain_name": "optimism-mainnet",
+        "protocol": "AaveV3",
+        "wrapped_symbol": "aOptDAI",
+        "wrapped_token_address": "0x82e64f49ed5ec1bc6e43dad4fc8af9bb3a2312ee",
+        "wrapped_decimals": 18,
+        "underlying_symbol": "DAI",
+    },
+    # Aave v3 (Polygon)
+    {
+        "chain_id": 137,
+        "chain_name": "matic-mainnet",
+        "protocol": "AaveV3",
+        "wrapped_symbol": "aPolUSDC",
+        "wrapped_token_address": "0x625e7708f30ca75bfd92586e17077590c60eb4cd",
+        "wrapped_decimals": 6,
+        "underlying_symbol": "USDC",
+    },
+    {
+        "chain_id": 137,
+        "chain_name": "matic-mainnet",
+        "protocol": "AaveV3",
+        "wrapped_symbol": "aPolUSDT",
+        "wrapped_token_address": "0x6ab707aca953edaefbc4fd23ba73294241490620",
+        "wrapped_decimals": 6,
+        "underlying_symbol": "USDT",
+    },
+    {
+        "chain_id": 137,
+        "chain_name": "matic-mainnet",
+        "protocol": "AaveV3",
+        "wrapped_symbol": "aPolDAI",
+        "wrapped_token_address": "0x82e64f49ed5ec1bc6e43dad4fc8af9bb3a2312ee",
+        "wrapped_decimals": 18,
+        "underlying_symbol": "DAI",
+    },
+    # Savings xDAI (Gnosis)
+    {
+        "chain_id": 100,
+        "chain_name": "gnosis-mainnet",
+        "protocol": "SparkSavings",
+        "wrapped_symbol": "sDAI",
+        "wrapped_token_address": "0xaf204776c7245bf4147c2612bf6e5972ee483701",
+        "wrapped_decimals": 18,
+        "underlying_symbol": "DAI",
+    },
 ]
 
+# Chains the scanner fans out over, keyed by Covalent chain name. block_time (seconds
+# per block) converts the Ethereum-block settings below to each chain; budget is the
+# chain's share of the Covalent key's requests/second and workers its concurrent units.
+CHAINS = {
+    "eth-mainnet": {"chain_id": 1, "block_time": 12.0, "budget": 2.0, "workers": 8, "fallback_head": 20900000},
+    "arbitrum-mainnet": {"chain_id": 42161, "block_time": 0.25, "budget": 0.5, "workers": 2},
+    "optimism-mainnet": {"chain_id": 10, "block_time": 2.0, "budget": 0.5, "workers": 2},
+    "matic-mainnet": {"chain_id": 137, "block_time": 2.0, "budget": 0.5, "workers": 2},
+    "gnosis-mainnet": {"chain_id": 100, "block_time": 5.0, "budget": 0.5, "workers": 2},
+}
+
+# Comma-separated subset of CHAINS to scan (default all), e.g. MINT_CHAINS=eth-mainnet
+SCAN_CHAINS = [c.strip() for c in os.getenv("MINT_CHAINS", ",".join(CHAINS)).split(",") if c.strip()]
+
 # Time window
 END_DT = datetime.now(timezone.utc)
 START_DT = END_DT - timedelta(days=1)
 
-# Block settings
+# Block settings, in Ethereum blocks (scaled to other chains with chain_blocks)
+BLOCK_TIME = 12  # seconds per block on Ethereum
 BLOCKS_PER_DAY = 7200  # ~12s per block on Ethereum
 BUFFER_BLOCKS = 500  # Smaller buffer to reduce load
 
+# Adaptive chunking: start at CHUNK_SIZE (Ethereum blocks, scaled per chain), grow on
+# sparse ranges, split busy or timed-out ones; the bounds are absolute block counts
+CHUNK_SIZE = 500
+MIN_CHUNK_SIZE = 50
+MAX_CHUNK_SIZE = 100000
+PAGE_SIZE = 100
+
+# Retries per request for 429s and for 5xx errors other than gateway timeouts
+MAX_RATE_LIMITED = 10
+MAX_SERVER_ERRORS = 3
+
+# Ethereum blocks per concurrent work unit (~1 week, scaled per chain)
+SEGMENT_SIZE = 50000
+
+# Concurrent (token, block segment) units on chains without their own workers setting;
+# pacing comes from the shared rate limiter
+MAX_WORKERS = 8
+
+# Seconds a resolved chain head is reused before it is fetched again
+HEAD_TTL = 300
+
+# Long-horizon backfill (run with MINT_MODE=backfill)
+BACKFILL_START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+BACKFILL_END = datetime(2025, 8, 2, tzinfo=timezone.utc)
+BACKFILL_DIR = "mint_backfill"
+
 # ------------------ HELPERS ------------------
 
+def chain_config(chain_name: str) -> dict:
+    """Block clock and budget of a chain; unknown chains get Ethereum's block time."""
+    return CHAINS.get(chain_name, {"block_time": BLOCK_TIME, "budget": None, "workers": MAX_WORKERS})
+
+def chain_blocks(chain_name: str, eth_blocks: int) -> int:
+    """Number of blocks on a chain spanning the same time as `eth_blocks` Ethereum blocks."""
+    return max(int(eth_blocks * BLOCK_TIME / chain_config(chain_name)["block_time"]), 1)
+
+def register_chain_budgets():
+    """
+    Give every chain its own Covalent budget in the shared rate limiter, so a busy
+    chain cannot starve the others. Budgets are keyed by the chain's URL prefix.
+    
+    Budgets the caller has set are kept: a chain prefix that already has one, and
+    every chain when the Covalent budget as a whole was changed from its default
+    (e.g. by the benchmark harness).
+    """
+    limiter = transport.rate_limiter
+    if limiter is None or not hasattr(limiter, "set_budget"):
+        return
+    
+    base = urlsplit(BASE_URL)
+    if limiter.budgets.get(base.netloc) != DEFAULT_BUDGETS.get(base.netloc):
+        return
+    
+    for chain_name, config in CHAINS.items():
+        prefix = f"{base.netloc}{base.path}/{chain_name}"
+        if config.get("budget") and prefix not in limiter.budgets:
+            limiter.set_budget(prefix, config["budget"])
+
+def active_tokens(tokens: List[dict] = None) -> List[dict]:
+    """The tokens (all of TOKENS by default) that live on one of SCAN_CHAINS."""
+    return [token for token in (tokens or TOKENS) if token["chain_name"] in SCAN_CHAINS]
+
+class RequestFailed(Exception):
+    """A Covalent request failed in a way that a smaller block range cannot fix."""
+
 def make_request(url: str, params: dict, timeout: int = 30, max_retries: int = 3) -> Optional[dict]:
-    """Make API request with retry logic."""
+    """
+    Make API request with retry logic.
+    
+    Returns the decoded response, or None after `max_retries` timeouts or gateway
+    timeouts (502/504), the failures a smaller block range can cure. A 429 is
+    retried once the shared rate limiter has waited out the server's Retry-After
+    (up to MAX_RATE_LIMITED times), other 5xx errors after a backoff (up to
+    MAX_SERVER_ERRORS times). Anything else, including any other 4xx, raises
+    RequestFailed.
+    """
     auth = (API_KEY, "")
+    attempt = 0
+    rate_limited = 0
+    server_errors = 0
     
-    for attempt in range(max_retries):
+    while attempt < max_retries:
         try:
-            response = requests.get(
+            response = transport.get(
                 url, 
                 params=params, 
                 auth=auth, 
                 timeout=timeout
             )
-            
-            if response.status_code == 200:
+        except requests.exceptions.Timeout:
+            attempt += 1
+            print(f"      Timeout (attempt {attempt}/{max_retries})")
+            if attempt < max_retries:
+                time.sleep(2 ** (attempt - 1))
+            continue
+        except Exception as e:
+            raise RequestFailed(f"Error: {str(e)[:100]}") from e
+        
+        if response.status_code == 200:
+            try:
                 return response.json()
-            elif response.status_code == 504 or response.status_code == 502:
-                wait_time = min(2 ** attempt, 10)
+            except ValueError as e:
+                raise RequestFailed(f"Invalid JSON: {str(e)[:100]}") from e
+        elif response.status_code == 504 or response.status_code == 502:
+            attempt += 1
+            # No wait after the last attempt, so callers can split the range at once
+            if attempt < max_retries:
+                wait_time = min(2 ** (attempt - 1), 10)
                 print(f"      Gateway timeout, retry in {wait_time}s...")
                 time.sleep(wait_time)
-            elif response.status_code == 400:
-                error_msg = response.text[:200]
-                print(f"      Bad request: {error_msg}")
-                return None
             else:
-                print(f"      HTTP {response.status_code}")
-                return None
-                
-        except requests.exceptions.Timeout:
-            print(f"      Timeout (attempt {attempt + 1}/{max_retries})")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-        except Exception as e:
-            print(f"      Error: {str(e)[:100]}")
-            return None
+                print(f"      Gateway timeout (attempt {attempt}/{max_retries})")
+        elif response.status_code == 429 and rate_limited < MAX_RATE_LIMITED:
+            # The shared rate limiter pauses this endpoint for the server's Retry-After
+            rate_limited += 1
+            print("      Rate limited, retrying after server-requested backoff...")
+        elif response.status_code >= 500 and server_errors < MAX_SERVER_ERRORS:
+            server_errors += 1
+            wait_time = 2 ** (server_errors - 1)
+            print(f"      HTTP {response.status_code}, retry in {wait_time}s...")
+            time.sleep(wait_time)
+        else:
+            raise RequestFailed(f"HTTP {response.status_code}: {response.text[:200]}")
     
     return None
 
-def get_latest_block() -> int:
-    """Get latest Ethereum block number."""
-    url = f"{BASE_URL}/eth-mainnet/block_v2/latest/"
+def get_latest_block(chain_name: str = "eth-mainnet") -> int:
+    """Get latest block number of a chain (Ethereum by default)."""
+    url = f"{BASE_URL}/{chain_name}/block_v2/latest/"
     
-    print("  Fetching latest block...")
-    data = make_request(url, {})
+    print(f"  Fetching latest {chain_name} block...")
+    try:
+        data = make_request(url, {})
+    except RequestFailed as e:
+        print(f"      {e}")
+        data = None
     
     if data and "data" in data:
         items = data["data"].get("items", [])
         if items and "height" in items[0]:
             block = int(items[0]["height"])
-            print(f"  Latest block: {block:,}")
+            print(f"  Latest {chain_name} block: {block:,}")
             return block
     
     # Fallback to estimate if API fails
+    fallback = chain_config(chain_name).get("fallback_head")
+    if fallback is None:
+        raise RuntimeError(f"Could not fetch the latest {chain_name} block")
     print("  Using estimated block number")
-    return 20900000  # Update this periodically
+    return fallback  # Update this periodically
 
-def fetch_token_events(
-    token_address: str,
-    start_block: int,
-    end_block: int,
-    max_events: int = 1000
-) -> List[dict]:
-    """Fetch Transfer events for a token."""
+class ChainHeads:
+    """
+    Run-scoped chain head service.
+    
+    The latest block of each chain is fetched once and shared by every token scan,
+    so all tokens get the same block window. Heads older than `ttl` seconds are
+    refreshed, which keeps long-running jobs from scanning a stale window.
+    """
+    
+    def __init__(self, ttl: float = HEAD_TTL):
+        self.ttl = ttl
+        self.heads = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+    
+    def chain_lock(self, chain_name: str) -> threading.Lock:
+        with self.lock:
+            return self.locks.setdefault(chain_name, threading.Lock())
+    
+    def latest(self, chain_name: str = "eth-mainnet") -> int:
+        """Latest block of a chain, from the cache while it is fresh."""
+        # One lock per chain, held across the fetch: concurrent callers for a chain
+        # trigger a single lookup, while other chains are looked up in parallel
+        with self.chain_lock(chain_name):
+            cached = self.heads.get(chain_name)
+            if cached and time.monotonic() - cached[1] < self.ttl:
+                return cached[0]
+            
+            block = get_latest_block(chain_name)
+            self.heads[chain_name] = (block, time.monotonic())
+            return block
+    
+    def window(self, chain_name: str = "eth-mainnet") -> Tuple[int, int]:
+        """(start_block, end_block) covering the last 24h on a chain."""
+        latest_block = self.latest(chain_name)
+        span = chain_blocks(chain_name, BLOCKS_PER_DAY + BUFFER_BLOCKS)
+        return latest_block - span, latest_block
+
+chain_heads = ChainHeads()
+
+def get_block_timestamp(chain_name: str, height: int) -> Optional[int]:
+    """Unix timestamp at which a block was signed (None if the lookup failed)."""
+    url = f"{BASE_URL}/{chain_name}/block_v2/{height}/"
+    try:
+        data = make_request(url, {})
+    except RequestFailed as e:
+        print(f"      {e}")
+        return None
+    
+    if data and "data" in data:
+        items = data["data"].get("items", [])
+        if items and items[0].get("signed_at"):
+            return int(dtp.parse(items[0]["signed_at"]).timestamp())
+    
+    return None
+
+block_indexes = {}
+block_indexes_lock = threading.Lock()
+
+def get_block_index(chain_name: str = "eth-mainnet") -> BlockIndex:
+    """The run's timestamp <-> block index for a chain (cached on disk between runs)."""
+    with block_indexes_lock:
+        if chain_name not in block_indexes:
+            block_indexes[chain_name] = BlockIndex(
+                chain_name,
+                get_timestamp=lambda height: get_block_timestamp(chain_name, height),
+                get_head=lambda: chain_heads.latest(chain_name),
+                block_time=chain_config(chain_name)["block_time"]
+            )
+        return block_indexes[chain_name]
+
+def scan_window(chain_name: str = "eth-mainnet", start_dt: datetime = None, end_dt: datetime = None) -> Tuple[int, int, bool]:
+    """
+    Block range to scan for [start_dt, end_dt) (the configured window by default).
+    
+    Returns (start_block, end_block, exact). The bounds come from the block index and
+    are exact; if block headers cannot be fetched, the head-based 24h estimate is used
+    instead and exact is False, so events must still be filtered by timestamp.
+    """
+    start_dt = start_dt or START_DT
+    end_dt = end_dt or END_DT
+    
+    try:
+        start_block, end_block = get_block_index(chain_name).block_range(start_dt, end_dt)
+        print(f"  {chain_name} window resolves to blocks {start_block:,} to {end_block:,}")
+        return start_block, end_block, True
+    except Exception as e:
+        print(f"  {chain_name} block index lookup failed ({str(e)[:100]}), estimating window from chain head")
+        start_block, end_block = chain_heads.window(chain_name)
+        return start_block, end_block, False
+
+def decode_mint_events(items: List[dict]) -> List[dict]:
+    """Pick the mints (Transfers from the zero address) out of decoded Covalent log events."""
     
     events = []
-    url = f"{BASE_URL}/eth-mainnet/events/address/{token_address}/"
     
-    # Process in smaller chunks to avoid timeouts
-    chunk_size = 500  # Smaller chunks for problematic tokens
-    current_start = start_block
+    # Process each event
+    for item in items:
+        # Check if it's a Transfer event
+        decoded = item.get("decoded", {})
+        
+        if decoded and decoded.get("name") == "Transfer":
+            params_list = decoded.get("params", [])
+            
+            # Extract from, to, and value
+            from_addr = None
+            to_addr = None
+            value = None
+            
+            for p in params_list:
+                name = p.get("name", "").lower()
+                val = p.get("value", "")
+                
+                if name == "from":
+                    from_addr = val.lower() if val else None
+                elif name == "to":
+                    to_addr = val.lower() if val else None
+                elif name in ["value", "amount"]:
+                    value = val
+            
+            # Check if it's a mint (from zero address)
+            if from_addr == ZERO_ADDRESS.lower() and value:
+                try:
+                    value_int = int(value)
+                    if value_int > 0:  # Only include non-zero mints
+                        events.append({
+                            "timestamp": item.get("block_signed_at"),
+                            "block": item.get("block_height"),
+                            "tx_hash": item.get("tx_hash"),
+                            "log_offset": item.get("log_offset"),
+                            "to_address": to_addr,
+                            "value": value_int
+                        })
+                except:
+                    pass
+    
+    return events
+
+def decode_mint_logs(items: List[dict]) -> List[dict]:
+    """
+    Decode mints from raw Transfer logs already filtered to topic1 = zero address:
+    `to` is the last 20 bytes of topic2 and `value` is the 32-byte data word.
+    The topics are checked again, so a filter the server ignored (or a reused
+    response) cannot let other logs through.
+    """
+    
+    events = []
     
-    while current_start < end_block and len(events) < max_events:
-        current_end = min(current_start + chunk_size, end_block)
+    for item in items:
+        topics = item.get("raw_log_topics") or []
+        data = item.get("raw_log_data") or ""
         
+        # Standard ERC-20 Transfer: 3 topics, value in data
+        if len(topics) != 3 or len(data) < 66:
+            continue
+        
+        # Transfer from the zero address, i.e. a mint
+        if topics[0].lower() != TRANSFER_TOPIC or int(topics[1], 16) != 0:
+            continue
+        
+        value_int = int(data[2:66], 16)
+        if value_int > 0:  # Only include non-zero mints
+            events.append({
+                "timestamp": item.get("block_signed_at"),
+                "block": item.get("block_height"),
+                "tx_hash": item.get("tx_hash"),
+                "log_offset": item.get("log_offset"),
+                "to_address": "0x" + topics[2][-40:].lower(),
+                "value": value_int
+            })
+    
+    return events
+
+def fetch_chunk(token_address: str, start_block: int, end_block: int, max_retries: int = 3,
+                chain_name: str = "eth-mainnet") -> Optional[Tuple[List[dict], int]]:
+    """
+    Fetch every page of one token's events in one block range.
+    Returns (mint events, number of raw events) or None if a request timed out;
+    other request failures raise RequestFailed.
+    """
+    
+    if USE_TOPIC_FILTER:
+        # Only mint logs come back, so payloads shrink to the mints themselves
+        url = f"{BASE_URL}/{chain_name}/events/topics/{TRANSFER_TOPIC}/"
+        filters = {"sender-address": token_address, "secondary-topics": ZERO_TOPIC}
+        decode = decode_mint_logs
+    else:
+        url = f"{BASE_URL}/{chain_name}/events/address/{token_address}/"
+        filters = {}
+        decode = decode_mint_events
+    
+    events = []
+    raw_count = 0
+    page = 0
+    
+    while True:
         params = {
-            "starting-block": current_start,
-            "ending-block": current_end,
-            "page-size": 100
+            "starting-block": start_block,
+            "ending-block": end_block,
+            "page-size": PAGE_SIZE,
+            "page-number": page,
+            **filters
         }
         
-        print(f"    Blocks {current_start:,} to {current_end:,}...")
-        
         # Shorter timeout for faster failure detection
-        response = make_request(url, params, timeout=20)
+        response = make_request(url, params, timeout=20, max_retries=max_retries)
         
-        if response and "data" in response:
-            items = response["data"].get("items", [])
-            
-            # Process each event
-            for item in items:
-                # Check if it's a Transfer event
-                decoded = item.get("decoded", {})
-                
-                if decoded and decoded.get("name") == "Transfer":
-                    params_list = decoded.get("params", [])
-                    
-                    # Extract from, to, and value
-                    from_addr = None
-                    to_addr = None
-                    value = None
-                    
-                    for p in params_list:
-                        name = p.get("name", "").lower()
-                        val = p.get("value", "")
-                        
-                        if name == "from":
-                            from_addr = val.lower() if val else None
-                        elif name == "to":
-                            to_addr = val.lower() if val else None
-                        elif name in ["value", "amount"]:
-                            value = val
-                    
-                    # Check if it's a mint (from zero address)
-                    if from_addr == ZERO_ADDRESS.lower() and value:
-                        try:
-                            value_int = int(value)
-                            if value_int > 0:  # Only include non-zero mints
-                                events.append({
-                                    "timestamp": item.get("block_signed_at"),
-                                    "block": item.get("block_height"),
-                                    "tx_hash": item.get("tx_hash"),
-                                    "to_address": to_addr,
-                                    "value": value_int
-                                })
-                        except:
-                            pass
+        if response is None:
+            return None
+        if "data" not in response:
+            raise RequestFailed(f"Unexpected response: {str(response)[:100]}")
+        
+        items = response["data"].get("items") or []
+        raw_count += len(items)
+        events.extend(decode(items))
+        
+        # Follow the pagination cursor until the range is complete
+        pagination = response["data"].get("pagination") or {}
+        if not pagination.get("has_more"):
+            return events, raw_count
+        page += 1
+
+def fetch_range(token_address: str, start_block: int, end_block: int,
+                chain_name: str = "eth-mainnet") -> Tuple[List[dict], List[Tuple[int, int]]]:
+    """
+    Fetch a token's mint events over a block range with adaptive chunk sizes.
+    
+    The chunk size starts at CHUNK_SIZE (scaled to the chain's block time), doubles after sparse responses (under a
+    quarter page) and halves after busy ones (more than one page), staying within
+    MIN_CHUNK_SIZE..MAX_CHUNK_SIZE. A chunk that times out is split and retried rather
+    than retried whole. Every page of every chunk is read, so nothing is truncated.
+    
+    Returns (events, failed ranges); a range only fails once it is MIN_CHUNK_SIZE
+    blocks and still times out. Any other request failure raises RequestFailed, which
+    fails the whole range instead of splitting it into requests that fail the same way.
+    """
+    
+    events = []
+    failed = []
+    chunk_size = min(max(chain_blocks(chain_name, CHUNK_SIZE), MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+    current_start = start_block
+    
+    while current_start <= end_block:
+        current_end = min(current_start + chunk_size - 1, end_block)
+        
+        # Large chunks fail fast: a gateway timeout is answered by splitting, not waiting
+        retries = 1 if chunk_size > MIN_CHUNK_SIZE else 3
+        result = fetch_chunk(token_address, current_start, current_end, max_retries=retries, chain_name=chain_name)
+        
+        if result is None:
+            if chunk_size > MIN_CHUNK_SIZE:
+                chunk_size = max(chunk_size // 2, MIN_CHUNK_SIZE)
+                print(f"      Blocks {current_start:,}-{current_end:,} failed, splitting to {chunk_size:,} blocks")
+                continue
+            print(f"      Giving up on blocks {current_start:,}-{current_end:,}")
+            failed.append((current_start, current_end))
+        else:
+            chunk_events, raw_count = result
+            events.extend(chunk_events)
             
-            print(f"      Found {len(items)} events, {len(events)} mints so far")
+            if raw_count > PAGE_SIZE:
+                chunk_size = max(chunk_size // 2, MIN_CHUNK_SIZE)
+            elif raw_count < PAGE_SIZE // 4:
+                chunk_size = min(chunk_size * 2, MAX_CHUNK_SIZE)
         
         current_start = current_end + 1
-        time.sleep(0.2)  # Rate limit
+    
+    return events, failed
+
+def plan_segments(start_block: int, end_block: int, segment_size: int = SEGMENT_SIZE) -> List[Tuple[int, int]]:
+    """Split a block range into inclusive (start, end) segments scanned as separate work units."""
+    
+    segments = []
+    current_start = start_block
+    
+    while current_start <= end_block:
+        current_end = min(current_start + segment_size - 1, end_block)
+        segments.append((current_start, current_end))
+        current_start = current_end + 1
+    
+    return segments
+
+def fetch_token_events(
+    token_address: str,
+    start_block: int,
+    end_block: int,
+    chain_name: str = "eth-mainnet"
+) -> List[dict]:
+    """Fetch Transfer events for a token."""
+    
+    print(f"    Blocks {start_block:,} to {end_block:,}...")
+    
+    events, failed = fetch_range(token_address, start_block, end_block, chain_name)
+    
+    print(f"      Found {len(events)} mints")
+    if failed:
+        print(f"      Warning: {len(failed)} block ranges could not be fetched")
     
     return events
 
+def chain_segments(chain_name: str, start_block: int, end_block: int) -> List[Tuple[int, int]]:
+    """Work-unit segments of a chain's block range (~1 week of blocks each)."""
+    return plan_segments(start_block, end_block, chain_blocks(chain_name, SEGMENT_SIZE))
+
+def plan_units(tokens: List[dict], windows: Dict[str, Tuple[int, int]]) -> List[Tuple[dict, int, int]]:
+    """
+    (token, start_block, end_block) work units covering each token's chain window.
+    `windows` maps chain name -> (start_block, end_block); tokens on chains without
+    a window are left out.
+    """
+    return [
+        (token, segment_start, segment_end)
+        for token in tokens
+        if token["chain_name"] in windows
+        for segment_start, segment_end in chain_segments(token["chain_name"], *windows[token["chain_name"]])
+    ]
+
+def scan_tokens(tokens: List[dict], windows: Dict[str, Tuple[int, int]], max_workers: int = None):
+    """
+    Scan several tokens, possibly on several chains, concurrently over their chain's
+    block window. Every (token, block segment) pair is one work unit; see scan_units.
+    """
+    return scan_units(plan_units(tokens, windows), max_workers)
+
+def scan_units(units: List[Tuple[dict, int, int]], max_workers: int = None):
+    """
+    Run (token, start_block, end_block) work units, one bounded thread pool per chain.
+    
+    Chains are scanned at the same time, each with its own pool (the chain's
+    `workers`, or max_workers if given) and its own budget in the transport's rate
+    limiter, so a slow or busy chain never holds up the others. Each unit walks its
+    range with fetch_range. Yields (token, start, end, events, failed ranges) as
+    units finish, in completion order across all chains.
+    
+    Only 2x a pool's workers units per chain are submitted at a time, and finished
+    units are dropped as soon as they are yielded, so the events held in memory stay
+    bounded by the units in flight, not by the total number of units.
+    """
+    units_by_chain = {}
+    for unit in units:
+        units_by_chain.setdefault(unit[0]["chain_name"], []).append(unit)
+    
+    workers = {
+        chain_name: max_workers or chain_config(chain_name)["workers"]
+        for chain_name in units_by_chain
+    }
+    executors = {
+        chain_name: ThreadPoolExecutor(max_workers=workers[chain_name])
+        for chain_name in units_by_chain
+    }
+    pending = {chain_name: iter(chain_units) for chain_name, chain_units in units_by_chain.items()}
+    futures = {}
+    
+    def submit_next(chain_name):
+        unit = next(pending[chain_name], None)
+        if unit is not None:
+            token, segment_start, segment_end = unit
+            future = executors[chain_name].submit(fetch_range, token["wrapped_token_address"], segment_start, segment_end, chain_name)
+            futures[future] = (chain_name, token, segment_start, segment_end)
+    
+    try:
+        for chain_name in units_by_chain:
+            for _ in range(2 * workers[chain_name]):
+                submit_next(chain_name)
+        
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                chain_name, token, segment_start, segment_end = futures.pop(future)
+                try:
+                    events, failed = future.result()
+                except Exception as e:
+                    print(f"      Error in {token['wrapped_symbol']} blocks {segment_start:,}-{segment_end:,}: {str(e)[:100]}")
+                    events, failed = [], [(segment_start, segment_end)]
+                # Refill the chain's window before handing the result over
+                submit_next(chain_name)
+                yield token, segment_start, segment_end, events, failed
+    finally:
+        for executor in executors.values():
+            executor.shutdown(wait=True, cancel_futures=True)
+
+def resolve_windows(chain_names: List[str], start_dt: datetime = None, end_dt: datetime = None) -> Dict[str, Tuple[int, int, bool]]:
+    """
+    scan_window for several chains at once (each chain's block search is sequential,
+    the chains are independent). Chains whose window cannot be resolved at all are
+    reported and left out. Returns {chain: (start_block, end_block, exact)}.
+    """
+    windows = {}
+    with ThreadPoolExecutor(max_workers=max(len(chain_names), 1)) as executor:
+        futures = {
+            executor.submit(scan_window, chain_name, start_dt, end_dt): chain_name
+            for chain_name in chain_names
+        }
+        for future in as_completed(futures):
+            chain_name = futures[future]
+            try:
+                windows[chain_name] = future.result()
+            except Exception as e:
+                print(f"  Skipping {chain_name}: {str(e)[:100]}")
+    return windows
+
 def process_token(token: dict) -> dict:
     """Process a single token and return statistics."""
     
@@ -259,97 +802,16 @@ def process_token(token: dict) -> dict:
     print(f"  Address: {token['wrapped_token_address']}")
     
     try:
-        # Get block range
-        latest_block = get_latest_block()
-        start_block = latest_block - BLOCKS_PER_DAY - BUFFER_BLOCKS
-        end_block = latest_block
+        # Get block range (shared with every other token on the chain)
+        start_block, end_block, exact = scan_window(token["chain_name"])
         
         # Fetch events
         events = fetch_token_events(
             token["wrapped_token_address"],
             start_block,
-            end_block
+            end_block,
+            token["chain_name"]
         )
-        
-        if not events:
-            print(f"  No mint events found")
-            return {
-                "protocol": token["protocol"],
-                "symbol": symbol,
-                "success": False,
-                "error": "No mints found",
-                "mints": 0,
-                "volume_usd": 0
-            }
-        
-        # Filter by timestamp
-        filtered_events = []
-        for event in events:
-            try:
-                event_time = dtp.parse(event["timestamp"]).replace(tzinfo=timezone.utc)
-                if START_DT <= event_time < END_DT:
-                    filtered_events.append(event)
-            except:
-                continue
-        
-        print(f"  Filtered to {len(filtered_events)} mints in last 24h")
-        
-        if not filtered_events:
-            return {
-                "protocol": token["protocol"],
-                "symbol": symbol,
-                "success": True,
-                "error": None,
-                "mints": 0,
-                "volume_usd": 0
-            }
-        
-        # Calculate statistics
-        total_minted = sum(e["value"] for e in filtered_events)
-        total_minted_human = total_minted / (10 ** token["wrapped_decimals"])
-        
-        # For stablecoins, estimate 1:1 USD value
-        if token["underlying_symbol"] in ["USDC", "USDT", "DAI"]:
-            volume_usd = total_minted_human
-        else:
-            volume_usd = 0
-        
-        # Create DataFrame for CSV export
-        rows = []
-        for event in filtered_events:
-            amount = event["value"] / (10 ** token["wrapped_decimals"])
-            
-            rows.append({
-                "timestamp": event["timestamp"],
-                "block": event["block"],
-                "tx_hash": event["tx_hash"],
-                "protocol": token["protocol"],
-                "wrapped_symbol": symbol,
-                "wrapped_address": token["wrapped_token_address"],
-                "underlying_symbol": token["underlying_symbol"],
-                "to_address": event["to_address"],
-                "amount": amount,
-                "amount_usd": amount if token["underlying_symbol"] in ["USDC", "USDT", "DAI"] else 0
-            })
-        
-        df = pd.DataFrame(rows)
-        
-        # Save individual token data
-        filename = f"{symbol}_mints_24h.csv"
-        df.to_csv(filename, index=False)
-        print(f"  Saved {len(df)} mints to {filename}")
-        
-        return {
-            "protocol": token["protocol"],
-            "symbol": symbol,
-            "success": True,
-            "error": None,
-            "mints": len(filtered_events),
-            "volume_usd": volume_usd,
-            "unique_addresses": df["to_address"].nunique() if not df.empty else 0,
-            "dataframe": df
-        }
-        
     except Exception as e:
         print(f"  ERROR: {str(e)[:200]}")
         return {
@@ -360,6 +822,257 @@ def process_token(token: dict) -> dict:
             "mints": 0,
             "volume_usd": 0
         }
+    
+    return summarize_token(token, events, in_window=exact)
+
+def in_time_window(event: dict) -> bool:
+    """Whether an event's timestamp falls in START_DT..END_DT."""
+    try:
+        event_time = dtp.parse(event["timestamp"]).replace(tzinfo=timezone.utc)
+    except:
+        return False
+    return START_DT <= event_time < END_DT
+
+def iter_mint_rows(token: dict, events: List[dict], in_window: bool = True):
+    """
+    Yield output rows for a token's mint events, with human-readable amounts.
+    With in_window=False the block window was estimated and events outside
+    START_DT..END_DT are skipped.
+    """
+    scale = 10 ** token["wrapped_decimals"]
+    is_stable = token["underlying_symbol"] in ["USDC", "USDT", "DAI"]
+    
+    for event in events:
+        if not in_window and not in_time_window(event):
+            continue
+        
+        amount = event["value"] / scale
+        
+        yield {
+            "timestamp": event["timestamp"],
+            "block": event["block"],
+            "tx_hash": event["tx_hash"],
+            "log_offset": event["log_offset"],
+            "protocol": token["protocol"],
+            "wrapped_symbol": token["wrapped_symbol"],
+            "wrapped_address": token["wrapped_token_address"],
+            "underlying_symbol": token["underlying_symbol"],
+            "to_address": event["to_address"],
+            "amount": amount,
+            "amount_usd": amount if is_stable else 0.0
+        }
+
+class TokenMints:
+    """
+    Streams one token's mint rows to {symbol}_mints_24h (and optionally a shared
+    combined writer) as its block segments arrive.
+    
+    Only running statistics are kept in memory, so a token's footprint stays flat
+    however many segments are scanned; rows go out in storage.TableWriter batches.
+    Rows for the combined writer are the exception: they are held until finish()
+    and only written once the token succeeded, so a token that fails partway never
+    leaves partial rows in the combined table.
+    """
+    
+    def __init__(self, token: dict, combined: storage.TableWriter = None):
+        self.token = token
+        self.combined = combined
+        self.combined_rows = []
+        self.writer = storage.TableWriter(f"{token['wrapped_symbol']}_mints_24h.csv")
+        self.error = None
+        
+        self.scanned = 0
+        self.mints = 0
+        self.volume_usd = 0.0
+        self.addresses = set()
+    
+    def add(self, events: List[dict], in_window: bool = False):
+        """Write the mints of one scanned segment that fall in the time window."""
+        if self.error:
+            return
+        
+        self.scanned += len(events)
+        try:
+            for row in iter_mint_rows(self.token, events, in_window):
+                self.mints += 1
+                self.volume_usd += row["amount_usd"]
+                self.addresses.add(row["to_address"])
+                
+                self.writer.write_row(row)
+                if self.combined is not None:
+                    self.combined_rows.append(row)
+        except Exception as e:
+            print(f"  ERROR: {str(e)[:200]}")
+            self.error = str(e)[:100]
+            self.combined_rows = []
+            self.writer.discard()
+    
+    def result(self, success: bool, error: Optional[str] = None) -> dict:
+        return {
+            "protocol": self.token["protocol"],
+            "symbol": self.token["wrapped_symbol"],
+            "success": success,
+            "error": error,
+            "mints": self.mints if success else 0,
+            "volume_usd": self.volume_usd if success else 0,
+            "unique_addresses": len(self.addresses) if success else 0
+        }
+    
+    def finish(self) -> dict:
+        """Close the token's file and return its statistics."""
+        if self.error:
+            return self.result(False, self.error)
+        
+        if not self.scanned:
+            self.writer.discard()
+            print(f"  No mint events found")
+            return self.result(False, "No mints found")
+        
+        print(f"  Filtered to {self.mints} mints in last 24h")
+        
+        try:
+            filename = self.writer.close()
+        except Exception as e:
+            print(f"  ERROR: {str(e)[:200]}")
+            self.writer.discard()
+            self.combined_rows = []
+            return self.result(False, str(e)[:100])
+        
+        if self.combined is not None:
+            self.combined.write_rows(self.combined_rows)
+            self.combined_rows = []
+        
+        if filename:
+            print(f"  Saved {self.mints} mints to {filename}")
+        
+        return self.result(True)
+
+def summarize_token(token: dict, events: List[dict], in_window: bool = False) -> dict:
+    """
+    Filter a token's mint events to the time window, save them and return statistics.
+    With in_window=True the events came from exact block bounds and are not re-checked.
+    """
+    mints = TokenMints(token)
+    mints.add(events, in_window)
+    return mints.finish()
+
+# ------------------ BACKFILL ------------------
+
+def backfill_partition_path(checkpoint_dir: str, symbol: str, start_block: int, end_block: int) -> str:
+    """Output partition for one (token, block segment) unit."""
+    return os.path.join(checkpoint_dir, symbol, f"{symbol}_mints_{start_block}_{end_block}.csv")
+
+def read_backfill_manifest(checkpoint_dir: str) -> List[dict]:
+    """Completed units recorded so far, skipping a partially written last line."""
+    path = os.path.join(checkpoint_dir, "manifest.jsonl")
+    if not os.path.exists(path):
+        return []
+    
+    entries = []
+    with open(path) as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return entries
+
+def backfill(start_dt: datetime, end_dt: datetime, tokens: List[dict] = None,
+             checkpoint_dir: str = BACKFILL_DIR, max_workers: int = None) -> dict:
+    """
+    Scan an arbitrary time range (e.g. all of 2020-2025) for mints, resumably.
+    
+    The range is resolved to exact block bounds on every chain the tokens live on and
+    cut into (token, segment) units; chains are scanned concurrently. Each finished unit is written as its own partition under
+    checkpoint_dir/{symbol}/ and then recorded in checkpoint_dir/manifest.jsonl.
+    Re-running the same backfill skips every recorded unit, so an interrupted scan
+    resumes where it stopped. Units with block ranges that could not be fetched are
+    not recorded and are retried on the next run.
+    
+    Returns {symbol: mints written this run}.
+    """
+    tokens = active_tokens(tokens)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    manifest_path = os.path.join(checkpoint_dir, "manifest.jsonl")
+    register_chain_budgets()
+    
+    print(f"Backfill {start_dt:%Y-%m-%d} to {end_dt:%Y-%m-%d}, checkpoints in {checkpoint_dir}")
+    chain_names = sorted({token["chain_name"] for token in tokens})
+    windows = {}
+    for chain_name, (start_block, end_block, exact) in resolve_windows(chain_names, start_dt, end_dt).items():
+        if exact:
+            windows[chain_name] = (start_block, end_block)
+        else:
+            print(f"  Skipping {chain_name}: backfills need exact block bounds and block headers could not be fetched")
+    if not windows:
+        raise RuntimeError("Backfills need exact block bounds; block headers could not be fetched")
+    
+    completed = {
+        (entry["symbol"], entry["start"], entry["end"])
+        for entry in read_backfill_manifest(checkpoint_dir)
+    }
+    
+    units = [
+        unit for unit in plan_units(tokens, windows)
+        if (unit[0]["wrapped_symbol"], unit[1], unit[2]) not in completed
+    ]
+    
+    total_units = len(units) + len(completed)
+    print(f"Units: {total_units:,} total, {len(completed):,} already done, {len(units):,} to scan")
+    
+    written = {token["wrapped_symbol"]: 0 for token in tokens}
+    incomplete = 0
+    
+    for done, (token, segment_start, segment_end, events, failed) in enumerate(scan_units(units, max_workers), start=1):
+        symbol = token["wrapped_symbol"]
+        
+        if failed:
+            incomplete += 1
+            print(f"  {symbol} blocks {segment_start:,}-{segment_end:,}: {len(failed)} ranges failed, will retry next run")
+            continue
+        
+        partition = None
+        if events:
+            path = backfill_partition_path(checkpoint_dir, symbol, segment_start, segment_end)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with storage.TableWriter(path, csv_export=False) as writer:
+                writer.write_rows(iter_mint_rows(token, events))
+            partition = writer.primary
+            written[symbol] += len(events)
+        
+        # Record the unit only after its partition is on disk
+        with open(manifest_path, "a") as f:
+            f.write(json.dumps({
+                "symbol": symbol,
+                "start": segment_start,
+                "end": segment_end,
+                "rows": len(events),
+                "file": partition
+            }) + "\n")
+        
+        if done % 10 == 0 or done == len(units):
+            print(f"  Progress: {done:,}/{len(units):,} units this run, {sum(written.values()):,} mints written")
+    
+    print(f"\nBackfill pass finished: {incomplete} units incomplete")
+    if incomplete:
+        print("Run the backfill again to retry them")
+    
+    return written
+
+def load_backfill(checkpoint_dir: str = BACKFILL_DIR, symbols: List[str] = None) -> pd.DataFrame:
+    """Load the partitions of a backfill (optionally only some tokens) into one DataFrame."""
+    frames = []
+    for entry in read_backfill_manifest(checkpoint_dir):
+        if entry["file"] and (symbols is None or entry["symbol"] in symbols):
+            frames.append(storage.read_table(entry["file"]))
+    
+    if not frames:
+        return pd.DataFrame()
+    
+    df = pd.concat(frames, ignore_index=True)
+    # The last segment of a range ending at the chain head is rescanned as the head moves
+    df = df.drop_duplicates(subset=["wrapped_symbol", "tx_hash", "log_offset"])
+    return df.sort_values(["block", "log_offset"]).reset_index(drop=True)
 
 # ------------------ MAIN ------------------
 
@@ -370,26 +1083,64 @@ def main():
     print("WRAPPED STABLECOIN MINTS TRACKER")
     print("=" * 70)
     print(f"Time range: {START_DT.strftime('%Y-%m-%d %H:%M')} to {END_DT.strftime('%Y-%m-%d %H:%M')} UTC")
-    print(f"Tracking {len(TOKENS)} tokens")
+    tokens = active_tokens()
+    chain_names = sorted({token["chain_name"] for token in tokens})
+    print(f"Tracking {len(tokens)} tokens on {len(chain_names)} chains: {', '.join(chain_names)}")
     print("=" * 70)
     
     results = []
-    all_dataframes = []
+    register_chain_budgets()
+    
+    # One exact block window per chain, shared by every token on it
+    windows = resolve_windows(chain_names)
+    
+    for chain_name, (start_block, end_block, exact) in sorted(windows.items()):
+        config = chain_config(chain_name)
+        num_segments = len(chain_segments(chain_name, start_block, end_block))
+        num_tokens = sum(1 for token in tokens if token["chain_name"] == chain_name)
+        print(f"{chain_name}: blocks {start_block:,} to {end_block:,}, {num_segments} segments x {num_tokens} tokens, "
+              f"{config['workers']} workers, {config['budget'] or 'shared'} req/s")
+    
+    # Tokens on chains whose window could not be resolved are reported as failed
+    for token in tokens:
+        if token["chain_name"] not in windows:
+            results.append(TokenMints(token).result(False, f"No block window for {token['chain_name']}"))
     
-    # Process each token
-    for token in TOKENS:
-        result = process_token(token)
-        results.append(result)
+    # Rows are streamed to disk as segments land; the combined table is in scan order
+    combined = storage.TableWriter("all_wrapped_mints_24h.csv")
+    token_mints = {}
+    segments_left = {
+        token["wrapped_symbol"]: len(chain_segments(token["chain_name"], *windows[token["chain_name"]][:2]))
+        for token in tokens
+        if token["chain_name"] in windows
+    }
+    failed_ranges = {token["wrapped_symbol"]: [] for token in tokens}
+    block_windows = {chain_name: window[:2] for chain_name, window in windows.items()}
+    
+    # Scan all tokens on all chains concurrently; each token is summarised as soon as its last segment lands
+    for token, segment_start, segment_end, events, failed in scan_tokens(tokens, block_windows):
+        symbol = token["wrapped_symbol"]
+        
+        if symbol not in token_mints:
+            token_mints[symbol] = TokenMints(token, combined)
+        token_mints[symbol].add(events, in_window=windows[token["chain_name"]][2])
+        failed_ranges[symbol].extend(failed)
+        
+        segments_left[symbol] -= 1
+        if segments_left[symbol] > 0:
+            continue
+        
+        mints = token_mints.pop(symbol)
+        print(f"\n{symbol} ({token['protocol']}) scanned: {mints.scanned} mints")
+        if failed_ranges[symbol]:
+            print(f"  Warning: {len(failed_ranges[symbol])} block ranges could not be fetched")
         
-        if result["success"] and "dataframe" in result:
-            all_dataframes.append(result["dataframe"])
+        results.append(mints.finish())
     
-    # Combine all data
-    if all_dataframes:
-        combined_df = pd.concat(all_dataframes, ignore_index=True)
-        combined_df.sort_values(["timestamp", "protocol", "wrapped_symbol"], inplace=True)
-        combined_df.to_csv("all_wrapped_mints_24h.csv", index=False)
-        print(f"\nCombined data saved to all_wrapped_mints_24h.csv")
+    # Close the combined data
+    combined_file = combined.close()
+    if combined_file:
+        print(f"\nCombined data saved to {combined_file}")
     
     # Print summary
     print("\n" + "=" * 70)
@@ -430,4 +1181,7 @@ def main():
     print("Individual token CSVs have been created for detailed analysis")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if os.getenv("MINT_MODE") == "backfill":
+        backfill(BACKFILL_START, BACKFILL_END)
+    else:
+        main()
\ No newline at end of file
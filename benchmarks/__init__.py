@@ -0,0 +1,4 @@
+"""
+Offline performance tooling: a local stand-in for the upstream APIs and a
+benchmark harness that runs the collectors against it.
+"""
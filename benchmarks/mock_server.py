@@ -0,0 +1,635 @@
+"""
+Local stand-in for every upstream API the collectors call.
+
+One threaded HTTP server answers the endpoints used by:
+
+    Coinbase    /api/v3/brokerage/market/products/{id}/candles   (fetch_candles)
+    Binance     /api/v3/klines, /fapi/v1/fundingRate,             (BinanceHourlyHistoricalData)
+                /futures/data/{openInterestHist, globalLongShortAccountRatio, takerlongshortRatio}
+    Covalent    /v1/{chain}/block_v2/{height}/,                    (make_request, fetch_chunk)
+                /v1/{chain}/events/address/{addr}/, /v1/{chain}/events/topics/{topic}/
+    DeFiLlama   /protocols, /protocol/{slug}, /v2/historicalChainTvl/{chain}   (fetch_protocol)
+                /stablecoins, /stablecoincharts/all
+
+Responses are replayed from a recordings directory when one is given and a file
+exists for the path (e.g. recordings/protocol/aave.json, saved from the live API),
+and synthesised otherwise: deterministic series in the real response layouts,
+sized like the real ones. Covalent block heights follow each chain's block clock
+so block/timestamp searches behave as they do live.
+
+DeFiLlama responses carry an ETag and answer a matching If-None-Match with an
+empty 304, so response caches can be measured. Every response can be delayed
+and replaced by a 5xx or a 429 with Retry-After.
+Collectors are pointed at the server through common.transport's host overrides,
+so they run unmodified:
+
+    python benchmarks/mock_server.py
+    API_OVERRIDES="api.coinbase.com=http://127.0.0.1:8100,..." python Crypto_Price_Data/coinbase_candles.py
+
+Configuration:
+    MOCK_PORT          port to listen on (default 8100)
+    MOCK_LATENCY       seconds added to every response (default 0.05)
+    MOCK_JITTER        extra uniformly random seconds on top (default 0.02)
+    MOCK_ERROR_RATE    fraction of requests answered with a 5xx (default 0)
+    MOCK_429_RATE      fraction of requests answered with a 429 (default 0)
+    MOCK_RETRY_AFTER   Retry-After seconds sent with each 429 (default 1)
+    MOCK_RECORDINGS    directory of recorded responses to replay
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Hosts the server stands in for, in the form common.transport overrides expect
+API_HOSTS = [
+    "api.coinbase.com",
+    "api.binance.com",
+    "fapi.binance.com",
+    "api.covalenthq.com",
+    "api.llama.fi",
+    "stablecoins.llama.fi",
+]
+
+DAY = 86400
+HOUR = 3600
+
+# Covalent block clocks: (anchor height, anchor Unix time, seconds per block)
+CHAIN_CLOCKS = {
+    "eth-mainnet": (15537394, 1663224179, 12.0),          # the Merge
+    "arbitrum-mainnet": (22207817, 1661956342, 0.25),     # Nitro upgrade
+    "optimism-mainnet": (105235063, 1686068903, 2.0),     # Bedrock upgrade
+    "matic-mainnet": (40000000, 1677800000, 2.0),
+    "gnosis-mainnet": (25000000, 1670000000, 5.0),
+}
+
+# Covalent rejects ranges wider than this with a 504, like the live API under load
+MAX_EVENT_RANGE = 200000
+
+# Blocks between synthetic mints of one token, and between its other transfers
+MINT_EVERY = 50
+TRANSFER_EVERY = 7
+
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+ZERO_ADDRESS = "0x" + "0" * 40
+
+# Catalog entries the collectors look up by name; the rest is filler of realistic size
+PROTOCOLS = [
+    ("Aave", "aave"),
+    ("Compound", "compound-finance"),
+    ("MakerDAO", "makerdao"),
+    ("Uniswap", "uniswap"),
+    ("Curve", "curve-dex"),
+    ("Lido", "lido"),
+]
+CATALOG_SIZE = 4000
+PROTOCOL_CHAINS = ["Ethereum", "Arbitrum", "Optimism", "Polygon", "Avalanche"]
+PROTOCOL_TOKENS = ["USDC", "USDT", "DAI", "WETH", "WBTC", "LINK", "UNI", "AAVE", "CRV", "LDO"]
+
+STABLECOINS = [("1", "Tether", "USDT"), ("2", "USD Coin", "USDC"), ("3", "Binance USD", "BUSD"),
+               ("5", "Dai", "DAI"), ("7", "TrueUSD", "TUSD")]
+
+SERIES_START = int(datetime(2019, 1, 1, tzinfo=timezone.utc).timestamp())
+FUNDING_START = int(datetime(2019, 9, 10, 8, tzinfo=timezone.utc).timestamp())
+
+
+def wave(t, base, amplitude=0.2, period=30 * DAY):
+    """
+    Smooth deterministic series used for every synthetic price, TVL and supply.
+    """
+    return base * (1 + amplitude * math.sin(t / period) + 0.02 * math.sin(t / HOUR))
+
+
+def today():
+    return int(time.time()) // DAY * DAY
+
+
+def json_params(query):
+    return {key: values[0] for key, values in parse_qs(query).items()}
+
+
+# ------------------ COINBASE ------------------
+
+COINBASE_GRANULARITIES = {
+    "ONE_MINUTE": 60, "FIVE_MINUTE": 300, "FIFTEEN_MINUTE": 900,
+    "ONE_HOUR": 3600, "SIX_HOUR": 21600, "ONE_DAY": 86400,
+}
+
+
+def coinbase_candles(product_id, params):
+    granularity = COINBASE_GRANULARITIES.get(params.get("granularity"))
+    if granularity is None:
+        return 400, {"error": "INVALID_ARGUMENT", "message": "unknown granularity"}
+
+    end = int(params.get("end", time.time()))
+    start = int(params.get("start", end - 300 * granularity))
+    if (end - start) // granularity > 350:
+        return 400, {"error": "INVALID_ARGUMENT", "message": "number of candles requested should be less than 350"}
+
+    base = 30000.0 if product_id.startswith("BTC") else 2000.0 if product_id.startswith("ETH") else 1.0
+    first = start + (-start % granularity)
+    now = int(time.time())
+
+    candles = []
+    for t in range(first, min(end, now), granularity):
+        price = wave(t, base)
+        candles.append({
+            "start": str(t),
+            "low": f"{price * 0.998:.2f}",
+            "high": f"{price * 1.002:.2f}",
+            "open": f"{price * 0.999:.2f}",
+            "close": f"{price:.2f}",
+            "volume": f"{10 + 5 * math.sin(t / 7200):.8f}",
+        })
+
+    # Newest first, like the live API
+    return 200, {"candles": candles[::-1]}
+
+
+# ------------------ BINANCE ------------------
+
+# Request weights per endpoint and per-minute limits per weight pool
+BINANCE_WEIGHTS = {"/api/v3/klines": 2}
+BINANCE_POOLS = {"/api/": 6000, "/fapi/": 2400, "/futures/": 2400}
+
+
+def hours_between(start_ms, end_ms, limit):
+    start = int(start_ms) // 1000
+    first = start + (-start % HOUR)
+    end = min(int(end_ms) // 1000, int(time.time()))
+    return list(range(first, end + 1, HOUR))[:limit]
+
+
+def binance_klines(params):
+    limit = min(int(params.get("limit", 500)), 1000)
+    end_ms = params.get("endTime", time.time() * 1000)
+    base = 30000.0 if params.get("symbol", "").startswith("BTC") else 2000.0
+
+    rows = []
+    for t in hours_between(params.get("startTime", 0), end_ms, limit):
+        price = wave(t, base)
+        volume = 1000 + 300 * math.sin(t / DAY)
+        rows.append([
+            t * 1000, f"{price * 0.999:.2f}", f"{price * 1.004:.2f}", f"{price * 0.996:.2f}", f"{price:.2f}",
+            f"{volume:.4f}", t * 1000 + HOUR * 1000 - 1, f"{volume * price:.2f}", 5000 + t % 997,
+            f"{volume * 0.52:.4f}", f"{volume * 0.52 * price:.2f}", "0",
+        ])
+    return 200, rows
+
+
+def binance_funding(params):
+    limit = min(int(params.get("limit", 100)), 1000)
+    end = min(int(params.get("endTime", time.time() * 1000)) // 1000, int(time.time()))
+    start = max(int(params.get("startTime", 0)) // 1000, FUNDING_START)
+
+    # Latest `limit` funding times (every 8h) in [start, end], oldest first
+    last = end - (end - FUNDING_START) % (8 * HOUR)
+    first = max(start + (-(start - FUNDING_START) % (8 * HOUR)), last - (limit - 1) * 8 * HOUR)
+    return 200, [
+        {"symbol": params.get("symbol"), "fundingTime": t * 1000,
+         "fundingRate": f"{0.0001 * (1 + math.sin(t / (3 * DAY))):.8f}", "markPrice": f"{wave(t, 30000.0):.2f}"}
+        for t in range(first, last + 1, 8 * HOUR)
+    ]
+
+
+def binance_futures_data(name, params):
+    limit = min(int(params.get("limit", 30)), 500)
+    hours = hours_between(params.get("startTime", 0), params.get("endTime", time.time() * 1000), limit)
+    symbol = params.get("symbol")
+
+    rows = []
+    for t in hours:
+        ratio = 1 + 0.3 * math.sin(t / DAY)
+        if name == "openInterestHist":
+            oi = wave(t, 80000.0, 0.1)
+            rows.append({"symbol": symbol, "sumOpenInterest": f"{oi:.4f}",
+                         "sumOpenInterestValue": f"{oi * wave(t, 30000.0):.4f}", "timestamp": t * 1000})
+        elif name == "globalLongShortAccountRatio":
+            long_share = ratio / (1 + ratio)
+            rows.append({"symbol": symbol, "longShortRatio": f"{ratio:.4f}", "longAccount": f"{long_share:.4f}",
+                         "shortAccount": f"{1 - long_share:.4f}", "timestamp": t * 1000})
+        else:
+            sell = wave(t, 5000.0, 0.3)
+            rows.append({"buySellRatio": f"{ratio:.4f}", "buyVol": f"{sell * ratio:.4f}",
+                         "sellVol": f"{sell:.4f}", "timestamp": t * 1000})
+    return 200, rows
+
+
+# ------------------ COVALENT ------------------
+
+def block_clock(chain):
+    return CHAIN_CLOCKS.get(chain, CHAIN_CLOCKS["eth-mainnet"])
+
+
+def chain_head(chain):
+    anchor_height, anchor_ts, block_time = block_clock(chain)
+    return anchor_height + int((time.time() - anchor_ts) / block_time)
+
+
+def block_timestamp(chain, height):
+    anchor_height, anchor_ts, block_time = block_clock(chain)
+    return int(anchor_ts + (height - anchor_height) * block_time)
+
+
+def iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def covalent_block(chain, height):
+    head = chain_head(chain)
+    height = head if height == "latest" else int(height)
+    if height > head:
+        return 404, {"error": True, "error_message": "Block not found"}
+    return 200, {"data": {"items": [{"height": height, "signed_at": iso(block_timestamp(chain, height))}]}}
+
+
+def token_transfers(chain, address, start, end, mints_only=False):
+    """
+    Synthetic Transfer logs of one token in [start, end]: a mint every MINT_EVERY blocks
+    and, unless mints_only, another transfer every TRANSFER_EVERY blocks.
+    """
+    seed = int(address[-4:], 16) if address else 0
+
+    blocks = [(b, True) for b in range(start + (-(start + seed) % MINT_EVERY), end + 1, MINT_EVERY)]
+    if not mints_only:
+        blocks += [(b, False) for b in range(start + (-(start + seed) % TRANSFER_EVERY), end + 1, TRANSFER_EVERY)]
+        blocks.sort()
+
+    items = []
+    for block, is_mint in blocks:
+        sender = ZERO_ADDRESS if is_mint else "0x" + f"{block:040x}"[-40:]
+        recipient = "0x" + f"{(block * 7919 + seed) % 10**6:040x}"
+        value = (block % 1000 + 1) * 10**6
+        items.append({
+            "block_signed_at": iso(block_timestamp(chain, block)),
+            "block_height": block,
+            "tx_hash": "0x" + f"{block:032x}{seed:032x}",
+            "log_offset": 0 if is_mint else 1,
+            "sender_address": address,
+            "raw_log_topics": [TRANSFER_TOPIC, "0x" + "0" * 24 + sender[2:], "0x" + "0" * 24 + recipient[2:]],
+            "raw_log_data": f"0x{value:064x}",
+            "decoded": {"name": "Transfer", "params": [
+                {"name": "from", "value": sender},
+                {"name": "to", "value": recipient},
+                {"name": "value", "value": str(value)},
+            ]},
+        })
+    return items
+
+
+def covalent_events(chain, kind, key, params):
+    start = int(params.get("starting-block", 0))
+    end = params.get("ending-block", "latest")
+    end = chain_head(chain) if end == "latest" else int(end)
+    if end - start > MAX_EVENT_RANGE:
+        return 504, {"error": True, "error_message": "Request timed out"}
+
+    if kind == "address":
+        items = token_transfers(chain, key.lower(), start, end)
+    else:
+        address = params.get("sender-address", "").lower()
+        secondary = params.get("secondary-topics")
+        mints_only = secondary is not None and int(secondary, 16) == 0
+        items = token_transfers(chain, address, start, end, mints_only=mints_only)
+
+    size = int(params.get("page-size", 100))
+    page = int(params.get("page-number", 0))
+    chunk = items[page * size:(page + 1) * size]
+    return 200, {"data": {"items": chunk, "pagination": {
+        "has_more": (page + 1) * size < len(items), "page_number": page, "page_size": size}}}
+
+
+# ------------------ DEFILLAMA ------------------
+
+@lru_cache(maxsize=1)
+def llama_catalog():
+    catalog = [{"name": name, "slug": slug, "category": "Lending", "chains": PROTOCOL_CHAINS}
+               for name, slug in PROTOCOLS]
+    for i in range(CATALOG_SIZE - len(PROTOCOLS)):
+        catalog.append({"name": f"Protocol {i:04d}", "slug": f"protocol-{i:04d}",
+                        "category": "Dexes", "chains": PROTOCOL_CHAINS[:1 + i % 5]})
+    return json.dumps(catalog).encode()
+
+
+def daily_points(start, base, seed):
+    return [(d, wave(d + seed * DAY, base)) for d in range(start + (-start % DAY), today() + 1, DAY)]
+
+
+def tvl_series(points):
+    return [{"date": d, "totalLiquidityUSD": round(v, 2)} for d, v in points]
+
+
+def token_series(points):
+    # Bulky per-token breakdowns the collectors never read, as in the live payloads
+    return [{"date": d, "tokens": {token: round(v / len(PROTOCOL_TOKENS), 2) for token in PROTOCOL_TOKENS}}
+            for d, v in points]
+
+
+@lru_cache(maxsize=32)
+def llama_protocol(slug):
+    if not any(s == slug for _, s in PROTOCOLS) and not slug.startswith("protocol-"):
+        return None
+
+    seed = sum(map(ord, slug))
+    start = SERIES_START + (seed % 300) * DAY
+    total = daily_points(start, 5e9, seed)
+
+    chain_tvls = {}
+    for i, chain in enumerate(PROTOCOL_CHAINS):
+        points = [(d, v / (2 + i)) for d, v in total]
+        chain_tvls[chain] = {"tvl": tvl_series(points), "tokensInUsd": token_series(points), "tokens": token_series(points)}
+
+    payload = {
+        "id": str(seed), "name": slug.title(), "slug": slug,
+        "chains": PROTOCOL_CHAINS,
+        "currentChainTvls": {chain: round(total[-1][1] / (2 + i), 2) for i, chain in enumerate(PROTOCOL_CHAINS)},
+        "chainTvls": chain_tvls,
+        "tvl": tvl_series(total),
+        "tokensInUsd": token_series(total),
+        "tokens": token_series(total),
+    }
+    return json.dumps(payload).encode()
+
+
+@lru_cache(maxsize=32)
+def llama_chain_tvl(chain):
+    seed = sum(map(ord, chain))
+    return json.dumps([{"date": d, "tvl": round(v, 2)}
+                       for d, v in daily_points(SERIES_START, 2e10 / (1 + seed % 7), seed)]).encode()
+
+
+def llama_stablecoins():
+    return 200, {"peggedAssets": [{"id": coin_id, "name": name, "symbol": symbol, "pegType": "peggedUSD"}
+                                  for coin_id, name, symbol in STABLECOINS]}
+
+
+@lru_cache(maxsize=16)
+def llama_stablecoin_chart(coin_id):
+    points = daily_points(SERIES_START, 3e10 / int(coin_id or 1), int(coin_id or 0))
+    return json.dumps([{"date": str(d), "totalCirculating": {"peggedUSD": round(v, 2)},
+                        "totalCirculatingUSD": {"peggedUSD": round(v, 2)}} for d, v in points]).encode()
+
+
+# ------------------ SERVER ------------------
+
+def service_for(path):
+    """
+    Upstream service a request path belongs to, for the statistics.
+    """
+    if path.startswith("/api/v3/brokerage"):
+        return "coinbase"
+    if path.startswith(("/api/v3", "/fapi", "/futures")):
+        return "binance"
+    if path.startswith("/v1/"):
+        return "covalent"
+    return "defillama"
+
+
+def route(path, params):
+    """
+    Synthesised response for a request: (status, JSON-able object or encoded bytes).
+    """
+    parts = [p for p in path.split("/") if p]
+
+    if path.startswith("/api/v3/brokerage/market/products/") and parts[-1] == "candles":
+        return coinbase_candles(parts[-2], params)
+
+    if path == "/api/v3/klines":
+        return binance_klines(params)
+    if path == "/fapi/v1/fundingRate":
+        return binance_funding(params)
+    if path.startswith("/futures/data/"):
+        return binance_futures_data(parts[-1], params)
+
+    if parts[:1] == ["v1"] and len(parts) >= 4:
+        chain = parts[1]
+        if parts[2] == "block_v2":
+            return covalent_block(chain, parts[3])
+        if parts[2] == "events" and len(parts) >= 5:
+            return covalent_events(chain, parts[3], parts[4], params)
+
+    if path == "/protocols":
+        return 200, llama_catalog()
+    if parts[:1] == ["protocol"] and len(parts) == 2:
+        body = llama_protocol(parts[1])
+        return (200, body) if body is not None else (400, {"message": "Protocol not found"})
+    if parts[:2] == ["v2", "historicalChainTvl"] and len(parts) == 3:
+        return 200, llama_chain_tvl(parts[2].lower())
+    if path == "/stablecoins":
+        return llama_stablecoins()
+    if path == "/stablecoincharts/all":
+        return 200, llama_stablecoin_chart(params.get("stablecoin", "1"))
+
+    return 404, {"error": f"No mock for {path}"}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.mock.handle(self)
+
+
+class MockAPIServer:
+    """
+    Threaded mock of all upstream APIs with injectable latency, errors and 429s.
+
+    Counts requests, statuses and bytes per service; stats() and reset_stats() let a
+    benchmark read them per scenario.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 rate_429=0.0, retry_after=1.0, recordings=None, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.recordings = recordings
+
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+        self.httpd = ThreadingHTTPServer((host, port), MockHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def overrides(self):
+        """
+        {host: base_url} for common.transport.configure(host_overrides=...).
+        """
+        return {host: self.base_url for host in API_HOSTS}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self):
+        with self.lock:
+            self.requests = Counter()
+            self.statuses = defaultdict(Counter)
+            self.bytes_sent = Counter()
+            self.binance_weight = {}
+
+    def stats(self):
+        """
+        {service: {"requests", "bytes", "statuses": {code: count}}}.
+        """
+        with self.lock:
+            return {
+                service: {
+                    "requests": self.requests[service],
+                    "bytes": self.bytes_sent[service],
+                    "statuses": dict(self.statuses[service]),
+                }
+                for service in self.requests
+            }
+
+    def roll_fault(self):
+        with self.lock:
+            roll = self.random.random()
+            delay = self.latency + self.random.uniform(0, self.jitter)
+        if roll < self.rate_429:
+            return delay, 429
+        if roll < self.rate_429 + self.error_rate:
+            return delay, 500
+        return delay, None
+
+    def used_weight(self, path):
+        """
+        Binance weight used in the current minute by this request's weight pool.
+        """
+        pool = next((prefix for prefix in BINANCE_POOLS if path.startswith(prefix)), None)
+        if pool is None:
+            return None
+
+        minute = int(time.time() // 60)
+        with self.lock:
+            window, used = self.binance_weight.get(pool, (minute, 0))
+            if window != minute:
+                used = 0
+            used += BINANCE_WEIGHTS.get(path, 1)
+            self.binance_weight[pool] = (minute, used)
+        return used
+
+    def replay(self, path):
+        if not self.recordings:
+            return None
+        recorded = os.path.join(self.recordings, path.strip("/") + ".json")
+        if os.path.exists(recorded):
+            with open(recorded, "rb") as f:
+                return f.read()
+        return None
+
+    def handle(self, handler):
+        url = urlsplit(handler.path)
+        service = service_for(url.path)
+        delay, fault = self.roll_fault()
+        if delay > 0:
+            time.sleep(delay)
+
+        headers = {}
+        if fault == 429:
+            status, body = 429, {"error": "Too many requests"}
+            headers["Retry-After"] = str(self.retry_after)
+        elif fault is not None:
+            status, body = fault, {"error": "Internal server error"}
+        else:
+            body = self.replay(url.path)
+            status = 200
+            if body is None:
+                try:
+                    status, body = route(url.path, json_params(url.query))
+                except (ValueError, KeyError) as e:
+                    status, body = 400, {"error": f"Bad request: {e}"}
+
+        if service == "binance":
+            used = self.used_weight(url.path)
+            if used is not None:
+                headers["X-MBX-USED-WEIGHT-1M"] = str(used)
+
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+
+        if service == "defillama" and status == 200:
+            etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+            headers["ETag"] = etag
+            if handler.headers.get("If-None-Match") == etag:
+                status, body = 304, b""
+
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+        with self.lock:
+            self.requests[service] += 1
+            self.statuses[service][status] += 1
+            self.bytes_sent[service] += len(body)
+
+
+def from_env(port=None):
+    """
+    Server configured from the MOCK_* environment variables.
+    """
+    return MockAPIServer(
+        port=int(os.getenv("MOCK_PORT", "8100")) if port is None else port,
+        latency=float(os.getenv("MOCK_LATENCY", "0.05")),
+        jitter=float(os.getenv("MOCK_JITTER", "0.02")),
+        error_rate=float(os.getenv("MOCK_ERROR_RATE", "0")),
+        rate_429=float(os.getenv("MOCK_429_RATE", "0")),
+        retry_after=float(os.getenv("MOCK_RETRY_AFTER", "1")),
+        recordings=os.getenv("MOCK_RECORDINGS"),
+    )
+
+
+def main():
+    server = from_env()
+    overrides = ",".join(f"{host}={base}" for host, base in server.overrides().items())
+
+    print(f"Mock APIs listening on {server.base_url}")
+    print(f"Latency {server.latency}s (+{server.jitter}s jitter), "
+          f"{server.error_rate:.1%} errors, {server.rate_429:.1%} 429s")
+    print("\nPoint the collectors at it with:")
+    print(f'export API_OVERRIDES="{overrides}"')
+    sys.stdout.flush()
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        for service, counts in sorted(server.stats().items()):
+            print(f"{service:<10} {counts['requests']:>7} requests  {counts['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
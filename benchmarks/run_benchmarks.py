@@ -0,0 +1,295 @@
+"""
+Offline throughput benchmarks for the collectors.
+
+Starts the mock APIs from benchmarks/mock_server.py, then runs each collector
+end to end against them, each in a fresh process and scratch directory, and
+reports per scenario:
+
+    seconds      wall time of the whole fetch-and-write run
+    requests     requests the mock served (and how many were 429s / 5xx)
+    req/s        requests / seconds
+    MB           response bytes received
+    rows         rows the collector produced
+    peak RSS     peak resident memory of the process, and its growth over the
+                 baseline after imports
+
+Results are printed as a table and written to BENCH_OUTPUT as JSON, so runs
+before and after a concurrency or caching change can be compared.
+
+Configuration:
+    BENCH_SCENARIOS   comma-separated subset of SCENARIOS (default all)
+    BENCH_DAYS        days of history fetched by the range-based scenarios (default 30)
+    BENCH_WORKERS     worker threads for collectors that take them (default 8)
+    BENCH_BUDGET      requests/second for every endpoint instead of the documented
+                      budgets, e.g. 1000 to measure raw client throughput
+    BENCH_OUTPUT      JSON results file (default benchmark_results.json)
+    BENCH_VERBOSE=1   show the collectors' own output
+    MOCK_*            latency, error and 429 injection, see benchmarks/mock_server.py
+"""
+
+import io
+import json
+import multiprocessing
+import os
+import runpy
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+sys.path.insert(0, REPO_ROOT)
+from benchmarks import mock_server
+
+
+def repo_path(*parts):
+    return os.path.join(REPO_ROOT, *parts)
+
+
+def load_script(path, name):
+    """
+    Import a script whose file name is not a valid module name.
+    """
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def history_window(opts):
+    # Whole days ending at the last midnight, so repeated runs fetch the same range
+    end = datetime.combine(datetime.now().date(), datetime.min.time())
+    return end - timedelta(days=opts["days"]), end
+
+
+# ------------------ SCENARIOS ------------------
+
+def bench_coinbase(opts):
+    """5-minute BTC-USD candles: concurrent window backfill, then the dataset and price store writes."""
+    from Crypto_Price_Data.coinbase_candles import CoinbaseCandleFetcher
+
+    start, end = history_window(opts)
+    fetcher = CoinbaseCandleFetcher("BTC-USD")
+    df = fetcher.fetch_complete_historical_data(start, end, granularity=300, max_workers=opts["workers"])
+    if df is None:
+        return 0
+    fetcher.write_dataset_files(df, granularity=300)
+    return len(df)
+
+
+def bench_binance(opts):
+    """Every hourly leverage metric for BTCUSDT and ETHUSDT, fetched concurrently and joined."""
+    module = load_script(repo_path("Leverage_Data", "leverage-data.py"), "leverage_data")
+
+    collector = module.BinanceHourlyHistoricalData(store_dir="leverage_store")
+    collector.start_date, collector.end_date = history_window(opts)
+
+    symbols = ["BTCUSDT", "ETHUSDT"]
+    metrics = collector.fetch_all_metrics(symbols, max_workers=opts["workers"])
+
+    rows = 0
+    for symbol in symbols:
+        df = collector.join_hourly_data(symbol, metrics[symbol])
+        rows += 0 if df is None else len(df)
+    return rows
+
+
+def bench_covalent(opts):
+    """Resumable mint backfill for three tokens over the history window."""
+    from datetime import timezone
+    from Wrapped_Stablecoin_Data import mint
+
+    start, end = history_window(opts)
+    written = mint.backfill(start.replace(tzinfo=timezone.utc), end.replace(tzinfo=timezone.utc),
+                            mint.TOKENS[:3], max_workers=opts["workers"])
+    return sum(written.values())
+
+
+def bench_tvl_daily(opts):
+    """Daily TVL for six chains (TVL_Data/TVL_Daily/TVL-data-daily.py)."""
+    result = runpy.run_path(repo_path("TVL_Data", "TVL_Daily", "TVL-data-daily.py"))
+    return len(result["df"])
+
+
+def bench_tvl_hourly(opts):
+    """Protocol catalog, slug resolution and hourly TVL per protocol and chain (TVL-data-hourly.py)."""
+    from common import storage
+
+    runpy.run_path(repo_path("TVL_Data", "TVL_Daily", "TVL-data-hourly.py"), run_name="__main__")
+    return sum(len(storage.read_table(name)) for name in ("tvl_hourly_total.csv", "tvl_hourly_by_chain.csv")
+               if storage.find_table(name))
+
+
+def bench_stablecoins(opts):
+    """Stablecoin list and supply charts (stablecoin-supply-hourly.py)."""
+    result = runpy.run_path(repo_path("Stablecoin Daily Supply Data", "Stablecoin_Supply_Hourly",
+                                      "stablecoin-supply-hourly.py"), run_name="__main__")
+    return len(result["df"])
+
+
+SCENARIOS = {
+    "coinbase": bench_coinbase,
+    "binance": bench_binance,
+    "covalent": bench_covalent,
+    "tvl-daily": bench_tvl_daily,
+    "tvl-hourly": bench_tvl_hourly,
+    "stablecoins": bench_stablecoins,
+}
+
+
+# ------------------ HARNESS ------------------
+
+def peak_rss_mb():
+    """
+    Peak resident memory of this process in MB (None where unsupported).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_scenario(name, opts):
+    """
+    Run one scenario in the current (fresh) process. Returns timing and memory.
+    """
+    os.chdir(opts["workdir"])
+
+    # Import the heavy shared dependencies first so the baseline includes them
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    from common import transport
+
+    transport.configure(host_overrides=opts["overrides"])
+    if opts["budget"]:
+        for prefix in list(transport.rate_limiter.budgets):
+            transport.rate_limiter.set_budget(prefix, opts["budget"])
+
+    baseline = peak_rss_mb()
+    sink = sys.stdout if opts["verbose"] else io.StringIO()
+
+    rows, error = None, None
+    started = time.perf_counter()
+    try:
+        with redirect_stdout(sink):
+            rows = SCENARIOS[name](opts)
+    except Exception as e:
+        error = f"{type(e).__name__}: {str(e)[:200]}"
+    seconds = time.perf_counter() - started
+
+    return {
+        "scenario": name,
+        "seconds": seconds,
+        "rows": rows,
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak_rss_mb(),
+        "error": error,
+    }
+
+
+def summarize(result, stats):
+    """
+    Add the mock server's view of a scenario to its result.
+    """
+    requests = sum(s["requests"] for s in stats.values())
+    statuses = {}
+    for s in stats.values():
+        for code, count in s["statuses"].items():
+            statuses[code] = statuses.get(code, 0) + count
+
+    result.update({
+        "requests": requests,
+        "requests_per_second": requests / result["seconds"] if result["seconds"] else 0.0,
+        "throttled": statuses.get(429, 0),
+        "server_errors": sum(count for code, count in statuses.items() if code >= 500),
+        "mb_received": sum(s["bytes"] for s in stats.values()) / 1e6,
+        "services": stats,
+    })
+    return result
+
+
+def print_report(results):
+    print("\n" + "=" * 96)
+    print("BENCHMARK RESULTS")
+    print("=" * 96)
+    print(f"{'Scenario':<13} {'Seconds':>8} {'Requests':>9} {'Req/s':>8} {'429s':>6} {'5xx':>5} "
+          f"{'MB':>8} {'Rows':>10} {'Peak RSS':>9} {'Growth':>8}")
+    print("-" * 96)
+
+    for r in results:
+        if r["error"]:
+            print(f"{r['scenario']:<13} FAILED: {r['error']}")
+            continue
+        peak = f"{r['peak_rss_mb']:.0f} MB" if r["peak_rss_mb"] is not None else "n/a"
+        growth = f"{r['peak_rss_mb'] - r['baseline_rss_mb']:.0f} MB" if r["peak_rss_mb"] is not None else "n/a"
+        print(f"{r['scenario']:<13} {r['seconds']:>8.2f} {r['requests']:>9,} {r['requests_per_second']:>8.1f} "
+              f"{r['throttled']:>6} {r['server_errors']:>5} {r['mb_received']:>8.1f} {r['rows'] or 0:>10,} "
+              f"{peak:>9} {growth:>8}")
+    print("=" * 96)
+
+
+def main():
+    names = os.getenv("BENCH_SCENARIOS")
+    names = [n.strip() for n in names.split(",")] if names else list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios {unknown}; choose from {list(SCENARIOS)}")
+
+    budget = os.getenv("BENCH_BUDGET")
+    output = os.getenv("BENCH_OUTPUT", "benchmark_results.json")
+
+    server = mock_server.from_env(port=0).start()
+    opts = {
+        "days": int(os.getenv("BENCH_DAYS", "30")),
+        "workers": int(os.getenv("BENCH_WORKERS", "8")),
+        "budget": float(budget) if budget else None,
+        "verbose": os.getenv("BENCH_VERBOSE", "0") == "1",
+        "overrides": server.overrides(),
+    }
+
+    print(f"Mock APIs on {server.base_url}: latency {server.latency}s (+{server.jitter}s), "
+          f"{server.error_rate:.1%} errors, {server.rate_429:.1%} 429s")
+    print(f"{opts['days']} days of history, {opts['workers']} workers, "
+          f"budget {opts['budget'] or 'documented'} req/s")
+
+    # A fresh interpreter per scenario keeps module state and peak memory separate
+    context = multiprocessing.get_context("spawn")
+
+    results = []
+    for name in names:
+        print(f"\nRunning {name}...")
+        server.reset_stats()
+
+        with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as workdir:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_scenario, name, dict(opts, workdir=workdir)).result()
+
+        result = summarize(result, server.stats())
+        results.append(result)
+        print(f"  {result['seconds']:.2f}s, {result['requests']:,} requests"
+              + (f" - FAILED: {result['error']}" if result["error"] else ""))
+
+    server.stop()
+    print_report(results)
+
+    config = {key: opts[key] for key in ("days", "workers", "budget")}
+    config.update(latency=server.latency, jitter=server.jitter, error_rate=server.error_rate,
+                  rate_429=server.rate_429)
+    with open(output, "w") as f:
+        json.dump({"config": config, "results": results}, f, indent=2, default=str)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
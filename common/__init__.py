@@ -0,0 +1,12 @@
+"""
+Shared infrastructure used by the data collection scripts.
+
+The scripts live in folders whose names (spaces, hyphens) are not importable
+packages, so they are run as plain files, e.g. python TVL_Data/TVL_Daily/TVL-data-daily.py.
+Each one therefore starts by putting the repository root on sys.path:
+
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+with one ".." per folder level, before importing from common (or from another
+script's folder, like Crypto_Price_Data or Wrapped_Stablecoin_Data).
+"""
@@ -0,0 +1,152 @@
+"""
+On-disk HTTP response cache with conditional revalidation.
+
+Large, slowly changing downloads (full TVL histories, protocol payloads) are kept
+between runs. Every later request for the same URL is sent with If-None-Match /
+If-Modified-Since, so an unchanged resource costs a 304 with an empty body instead
+of the whole payload.
+
+Layout under the cache directory:
+
+    index/{sha256(url)}.json    validators (ETag, Last-Modified) and the body's hash
+    bodies/{sha256(body)}       response bodies, content-addressed
+
+Bodies are stored once per distinct content, however many URLs return them.
+Requests go through common.transport, so they share its pooled sessions and
+rate limiter.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import requests
+
+from common import transport
+
+DEFAULT_DIR = "http_cache"
+
+
+class ResponseCache:
+    """
+    Conditional GETs backed by a directory of cached responses.
+
+    get() returns a requests.Response either way: a fresh 200 (cached if it carries
+    an ETag or Last-Modified), or the cached body re-served as a 200 after the server
+    answered 304. `response.from_cache` tells the two apart. Safe to share between
+    threads; every file is written to a temporary name and moved into place.
+    """
+
+    def __init__(self, directory=DEFAULT_DIR):
+        self.directory = directory
+        self.index_dir = os.path.join(directory, "index")
+        self.body_dir = os.path.join(directory, "bodies")
+        os.makedirs(self.index_dir, exist_ok=True)
+        os.makedirs(self.body_dir, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def full_url(url, params=None):
+        # The URL exactly as sent, so different query strings are cached separately
+        return requests.Request("GET", url, params=params).prepare().url
+
+    def index_path(self, url):
+        return os.path.join(self.index_dir, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def body_path(self, digest):
+        return os.path.join(self.body_dir, digest)
+
+    @staticmethod
+    def write_file(path, data):
+        tmp = f"{path}.{os.getpid()}.{id(data)}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def lookup(self, url):
+        """
+        Cached entry for a URL, or None if there is none (or its body is missing).
+        """
+        path = self.index_path(url)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not os.path.exists(self.body_path(entry["body"])):
+            return None
+        return entry
+
+    def store(self, url, response):
+        """
+        Keep a 200 response if it carries validators to revalidate it with later.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        if not os.path.exists(self.body_path(digest)):
+            self.write_file(self.body_path(digest), body)
+
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": response.headers.get("Content-Type"),
+            "body": digest,
+            "fetched_at": time.time(),
+        }
+        self.write_file(self.index_path(url), json.dumps(entry).encode())
+
+    def cached_response(self, url, entry, revalidation):
+        """
+        Rebuild a 200 response from a cache entry after a 304.
+        """
+        with open(self.body_path(entry["body"]), "rb") as f:
+            body = f.read()
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK (cached)"
+        response.url = url
+        response.headers = requests.structures.CaseInsensitiveDict(revalidation.headers)
+        if entry.get("content_type"):
+            response.headers["Content-Type"] = entry["content_type"]
+        response.headers["Content-Length"] = str(len(body))
+        response._content = body
+        response.from_cache = True
+        return response
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        """
+        GET through the cache. Extra keyword arguments go to transport.get().
+        """
+        url = self.full_url(url, params)
+        entry = self.lookup(url)
+
+        headers = dict(headers or {})
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = transport.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.hits += 1
+            return self.cached_response(url, entry, response)
+
+        self.misses += 1
+        response.from_cache = False
+        if response.status_code == 200:
+            self.store(url, response)
+        return response
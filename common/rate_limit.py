@@ -0,0 +1,228 @@
+"""
+Adaptive, per-endpoint rate limiting for the shared HTTP transport.
+
+Every request made through common.transport waits on the limiter for its endpoint
+before it is sent, and reports the response back afterwards. The limiter starts
+each endpoint at its documented request budget (DEFAULT_BUDGETS) and adapts using
+the server's own headers:
+
+    Retry-After                          pause that endpoint for exactly that long
+    X-MBX-USED-WEIGHT-1M (Binance)       pace the remaining weight over the rest of the minute
+    X-RateLimit-Remaining / -Reset       pace the remaining requests until the reset
+
+A 429/418/503 without Retry-After backs off exponentially (1s, 2s, 4s ... 60s).
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Documented request ceilings in requests/second, keyed by host or host + path prefix.
+# The longest matching prefix wins.
+DEFAULT_BUDGETS = {
+    "api.coinbase.com": 8.0,                        # 10 req/s public limit, with headroom
+    "api.binance.com": 40.0,                        # 6000 weight/min, klines cost 2
+    "fapi.binance.com": 20.0,                       # 2400 weight/min
+    "fapi.binance.com/fapi/v1/fundingRate": 1.5,    # 500 req / 5 min / IP
+    "fapi.binance.com/futures/data": 3.0,           # 1000 req / 5 min / IP
+    "api.covalenthq.com": 4.0,
+    "api.llama.fi": 5.0,
+    "stablecoins.llama.fi": 5.0,
+}
+
+# Binance request-weight limits per minute
+WEIGHT_LIMITS = {
+    "api.binance.com": 6000,
+    "fapi.binance.com": 2400,
+}
+
+DEFAULT_RATE = 5.0
+MAX_BACKOFF = 60.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by all concurrent request workers.
+    """
+
+    def __init__(self, rate=8.0, capacity=8):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def set_rate(self, rate):
+        with self.lock:
+            self.rate = max(rate, 0.01)
+
+    def acquire(self):
+        """
+        Block until a token is available, then consume it.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait_time = (1 - self.tokens) / self.rate
+
+            time.sleep(wait_time)
+
+
+def parse_retry_after(value):
+    """
+    Retry-After is either a number of seconds or an HTTP date. Returns seconds or None.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Per-endpoint token buckets whose pace follows the server's rate-limit headers.
+    """
+
+    def __init__(self, budgets=None, default_rate=DEFAULT_RATE):
+        self.budgets = dict(DEFAULT_BUDGETS)
+        if budgets:
+            self.budgets.update(budgets)
+        self.default_rate = default_rate
+
+        self.buckets = {}
+        self.blocked_until = {}
+        self.backoff = {}
+        self.weight_per_request = {}
+        self.last_weight = {}
+        self.lock = threading.Lock()
+
+    def key_for(self, url):
+        """
+        Longest budget prefix matching host + path, falling back to the bare host.
+        """
+        parts = urlsplit(url)
+        target = parts.netloc + parts.path
+        matches = [prefix for prefix in self.budgets if target.startswith(prefix)]
+        return max(matches, key=len) if matches else parts.netloc
+
+    def budget(self, url):
+        return self.budgets.get(self.key_for(url), self.default_rate)
+
+    def set_budget(self, prefix, rate):
+        """
+        Change the ceiling for an endpoint prefix, e.g. set_budget("api.coinbase.com", 8).
+        """
+        with self.lock:
+            self.budgets[prefix] = rate
+            self.buckets.pop(prefix, None)
+
+    def bucket(self, key):
+        with self.lock:
+            if key not in self.buckets:
+                rate = self.budgets.get(key, self.default_rate)
+                self.buckets[key] = TokenBucket(rate=rate, capacity=max(1, int(rate)))
+            return self.buckets[key]
+
+    def block(self, key, seconds):
+        with self.lock:
+            until = time.monotonic() + seconds
+            self.blocked_until[key] = max(self.blocked_until.get(key, 0.0), until)
+
+    def acquire(self, url):
+        """
+        Wait out any server-imposed pause for this endpoint, then take a token.
+        """
+        key = self.key_for(url)
+
+        while True:
+            with self.lock:
+                wait_time = self.blocked_until.get(key, 0.0) - time.monotonic()
+            if wait_time <= 0:
+                break
+            time.sleep(wait_time)
+
+        self.bucket(key).acquire()
+
+    def update(self, url, response):
+        """
+        Adapt the endpoint's pace from a response's status and headers.
+        """
+        key = self.key_for(url)
+        host = urlsplit(url).netloc
+        headers = response.headers
+        ceiling = self.budgets.get(key, self.default_rate)
+
+        if response.status_code in (418, 429, 503):
+            pause = parse_retry_after(headers.get("Retry-After"))
+            if pause is None:
+                with self.lock:
+                    pause = min(self.backoff.get(key, 0.5) * 2, MAX_BACKOFF)
+                    self.backoff[key] = pause
+            print(f"  [rate limit] {key}: HTTP {response.status_code}, pausing {pause:.1f}s")
+            self.block(key, pause)
+            return
+
+        with self.lock:
+            self.backoff.pop(key, None)
+
+        # Binance reports the weight used in the current minute window
+        used = headers.get("X-MBX-USED-WEIGHT-1M") or headers.get("X-MBX-USED-WEIGHT")
+        if used is not None and host in WEIGHT_LIMITS:
+            self.pace_binance_weight(key, host, int(used), ceiling)
+            return
+
+        # Generic remaining/reset headers
+        remaining = headers.get("X-RateLimit-Remaining") or headers.get("RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset") or headers.get("RateLimit-Reset")
+        if remaining is not None and reset is not None:
+            try:
+                remaining = float(remaining)
+                reset = float(reset)
+            except ValueError:
+                return
+            # Reset is either an epoch timestamp or seconds until reset
+            seconds_left = reset - time.time() if reset > 1e9 else reset
+            seconds_left = max(seconds_left, 0.1)
+
+            if remaining <= 0:
+                self.block(key, seconds_left)
+            else:
+                self.bucket(key).set_rate(min(ceiling, remaining / seconds_left))
+
+    def pace_binance_weight(self, key, host, used, ceiling):
+        """
+        Spread the weight left in this minute over the seconds left in it. Binance weight
+        windows reset on the minute, so the weight cost per request is learned from the
+        change in used weight between responses.
+        """
+        limit = WEIGHT_LIMITS[host]
+        seconds_left = max(60 - (time.time() % 60), 0.5)
+
+        with self.lock:
+            last = self.last_weight.get(host)
+            self.last_weight[host] = used
+            if last is not None and used > last:
+                cost = self.weight_per_request.get(host, used - last)
+                self.weight_per_request[host] = 0.8 * cost + 0.2 * (used - last)
+            cost = max(self.weight_per_request.get(host, 1.0), 1.0)
+
+        remaining = limit - used
+        if remaining <= limit * 0.05:
+            print(f"  [rate limit] {host}: used weight {used}/{limit}, waiting {seconds_left:.1f}s for reset")
+            self.block(key, seconds_left)
+        else:
+            self.bucket(key).set_rate(min(ceiling, remaining / cost / seconds_left))
@@ -0,0 +1,261 @@
+"""
+Columnar on-disk format for every dataset the collectors and cleaners write.
+
+Writers call write_table() with the same ".csv" path they used to pass to
+to_csv(). The table is stored as compressed Parquet (or Feather) next to it,
+keeping real datetime/float dtypes, and a CSV copy is exported alongside for
+spreadsheets and older tools. Readers call read_table() with the ".csv" path
+and get the columnar copy when one exists, falling back to the CSV otherwise.
+
+Configuration:
+    DATA_FORMAT=parquet|feather|csv   primary on-disk format (default parquet)
+    EXPORT_CSV=0                      skip the CSV export next to columnar files
+
+Columnar formats need pyarrow (pip install pyarrow); without it everything is
+written and read as CSV, as before.
+
+Collectors that produce rows incrementally use TableWriter instead, which writes
+the same files batch by batch (Parquet row groups, Arrow record batches or CSV
+chunks) so memory stays flat however long the scan runs.
+"""
+
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+FORMAT = os.getenv("DATA_FORMAT", "parquet")
+EXPORT_CSV = os.getenv("EXPORT_CSV", "1") == "1"
+COMPRESSION = "zstd"
+
+# Rows buffered by TableWriter before a batch is written out
+BATCH_SIZE = 50000
+
+EXTENSIONS = {
+    "parquet": ".parquet",
+    "feather": ".feather",
+    "csv": ".csv",
+}
+
+
+def configure(fmt=None, export_csv=None):
+    """
+    Change the output format or CSV export for tables written afterwards.
+    """
+    global FORMAT, EXPORT_CSV
+
+    if fmt is not None:
+        if fmt not in EXTENSIONS:
+            raise ValueError(f"Unknown format {fmt!r}; use one of {list(EXTENSIONS)}")
+        FORMAT = fmt
+    if export_csv is not None:
+        EXPORT_CSV = export_csv
+
+
+def table_path(path, fmt):
+    """
+    `path` with its extension swapped for the given format's.
+    """
+    return os.path.splitext(path)[0] + EXTENSIONS[fmt]
+
+
+def find_table(path):
+    """
+    Existing file for this dataset, preferring columnar copies over CSV.
+    Returns None if the dataset has not been written in any format.
+    """
+    for fmt in ("parquet", "feather", "csv"):
+        candidate = table_path(path, fmt)
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def write_table(df, path, fmt=None, csv_export=None):
+    """
+    Write `df` in the configured format, plus a CSV export unless disabled.
+
+    Files are written to a temporary name and moved into place, so readers never
+    see a half-written table. Returns the path of the primary file.
+    """
+    fmt = fmt or FORMAT
+    if csv_export is None:
+        csv_export = EXPORT_CSV
+    if fmt != "csv" and pyarrow is None:
+        print(f"pyarrow not installed - writing {os.path.basename(path)} as CSV only")
+        fmt = "csv"
+
+    primary = table_path(path, fmt)
+    tmp = primary + ".tmp"
+
+    if fmt == "parquet":
+        df.to_parquet(tmp, index=False, compression=COMPRESSION)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(tmp, compression=COMPRESSION)
+    else:
+        df.to_csv(tmp, index=False)
+    os.replace(tmp, primary)
+
+    if csv_export and fmt != "csv":
+        csv_path = table_path(path, "csv")
+        df.to_csv(csv_path + ".tmp", index=False)
+        os.replace(csv_path + ".tmp", csv_path)
+
+    return primary
+
+
+def read_table(path, columns=None, parse_dates=None):
+    """
+    Load a dataset written by write_table() (or any plain CSV).
+
+    `path` may name any of the formats; the columnar copy is used when present.
+    `parse_dates` only matters for CSV input - columnar files keep their dtypes.
+    """
+    found = find_table(path)
+    if found is None:
+        raise FileNotFoundError(f"No parquet, feather or csv file for {path}")
+
+    if found.endswith(".parquet"):
+        return pd.read_parquet(found, columns=columns)
+    if found.endswith(".feather"):
+        return pd.read_feather(found, columns=columns)
+    return pd.read_csv(found, usecols=columns, parse_dates=parse_dates)
+
+
+class TableWriter:
+    """
+    Write a table incrementally in the configured format, plus the CSV export.
+
+    Rows are buffered and flushed every `batch_size` rows: as a Parquet row group,
+    an Arrow record batch (Feather) or an appended CSV chunk. The schema is fixed by
+    the first batch and later batches are cast to it. Output goes to temporary
+    files that are moved into place by close(), so readers never see a partial
+    table. Use as a context manager; an exception discards the partial files.
+    """
+
+    def __init__(self, path, fmt=None, csv_export=None, batch_size=BATCH_SIZE):
+        fmt = fmt or FORMAT
+        if csv_export is None:
+            csv_export = EXPORT_CSV
+        if fmt != "csv" and pyarrow is None:
+            print(f"pyarrow not installed - writing {os.path.basename(path)} as CSV only")
+            fmt = "csv"
+
+        self.fmt = fmt
+        self.primary = table_path(path, fmt)
+        self.csv_path = table_path(path, "csv") if csv_export and fmt != "csv" else None
+        self.batch_size = batch_size
+
+        self.buffer = []
+        self.rows_written = 0
+        self.writer = None
+        self.schema = None
+        self.csv_started = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+        return False
+
+    def write_rows(self, rows):
+        """
+        Append an iterable of row dicts, flushing whenever a batch fills up.
+        """
+        for row in rows:
+            self.write_row(row)
+
+    def write_row(self, row):
+        """
+        Append a single row dict.
+        """
+        self.buffer.append(row)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered rows out as one batch.
+        """
+        if not self.buffer:
+            return
+
+        df = pd.DataFrame(self.buffer)
+        self.buffer = []
+
+        if self.fmt == "csv":
+            self.append_csv(df, self.primary)
+        else:
+            self.write_arrow(df)
+            if self.csv_path:
+                self.append_csv(df, self.csv_path)
+
+        self.rows_written += len(df)
+
+    def write_arrow(self, df):
+        import pyarrow.parquet as pq
+
+        table = pyarrow.Table.from_pandas(df, preserve_index=False)
+        if self.writer is None:
+            # A column that is all empty in the first batch is typed as string
+            # rather than null, so later batches with values can still be cast
+            fields = [
+                field.with_type(pyarrow.string()) if pyarrow.types.is_null(field.type) else field
+                for field in table.schema
+            ]
+            self.schema = pyarrow.schema(fields)
+            table = table.cast(self.schema)
+            tmp = self.primary + ".tmp"
+            if self.fmt == "parquet":
+                self.writer = pq.ParquetWriter(tmp, self.schema, compression=COMPRESSION)
+            else:
+                options = pyarrow.ipc.IpcWriteOptions(compression=COMPRESSION)
+                self.writer = pyarrow.ipc.new_file(tmp, self.schema, options=options)
+        else:
+            table = table.select(self.schema.names).cast(self.schema)
+
+        self.writer.write_table(table)
+
+    def append_csv(self, df, path):
+        # Header only with the first chunk of each file
+        first = path not in self.csv_started
+        self.csv_started.add(path)
+        df.to_csv(path + ".tmp", mode="w" if first else "a", header=first, index=False)
+
+    def close(self):
+        """
+        Flush the remaining rows and move the files into place.
+        Returns the primary path, or None if no rows were written.
+        """
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+        if self.rows_written == 0:
+            return None
+
+        os.replace(self.primary + ".tmp", self.primary)
+        if self.csv_path:
+            os.replace(self.csv_path + ".tmp", self.csv_path)
+        return self.primary
+
+    def discard(self):
+        """
+        Drop the buffered rows and delete the temporary files.
+        """
+        self.buffer = []
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        for path in (self.primary, self.csv_path):
+            if path and os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
@@ -0,0 +1,205 @@
+"""
+Shared HTTP transport for every collector in the repo.
+
+Instead of calling requests.get() directly (a new TCP+TLS handshake per call),
+collectors go through get(), which reuses one pooled keep-alive session per host.
+
+Every session is paced by a pluggable rate limiter (common.rate_limit.AdaptiveRateLimiter
+by default) that adapts to each server's rate-limit headers; replace it with
+set_rate_limiter().
+
+Configuration:
+    HTTP_POOL_SIZE   default connections kept alive per host (default 16)
+    HTTP2=1          use HTTP/2 via httpx when it is installed (pip install "httpx[http2]")
+    API_OVERRIDES    send requests for some hosts elsewhere, e.g. to the local mock
+                     server in benchmarks/: "api.llama.fi=http://127.0.0.1:8100,..."
+
+or call configure() before the first request. Per-host pool sizes can be set with
+configure(host_pool_sizes={"api.coinbase.com": 32}).
+"""
+
+import os
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from common.rate_limit import AdaptiveRateLimiter
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+DEFAULT_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+USE_HTTP2 = os.getenv("HTTP2", "0") == "1"
+
+# Per-host overrides of DEFAULT_POOL_SIZE
+HOST_POOL_SIZES = {}
+
+
+def parse_overrides(value):
+    """
+    "host=base_url,host=base_url" -> {host: base_url}.
+    """
+    overrides = {}
+    for entry in value.split(","):
+        if "=" in entry:
+            host, base = entry.split("=", 1)
+            overrides[host.strip()] = base.strip().rstrip("/")
+    return overrides
+
+
+# Host -> base URL that requests for that host are sent to instead
+HOST_OVERRIDES = parse_overrides(os.getenv("API_OVERRIDES", ""))
+
+sessions = {}
+sessions_lock = threading.Lock()
+
+# Shared by every session; anything with acquire(url) and update(url, response) works
+rate_limiter = AdaptiveRateLimiter()
+
+
+def configure(pool_size=None, http2=None, host_pool_sizes=None, host_overrides=None):
+    """
+    Change transport settings. Pool settings only affect sessions created afterwards;
+    host overrides apply to every request from then on.
+    """
+    global DEFAULT_POOL_SIZE, USE_HTTP2
+
+    if pool_size is not None:
+        DEFAULT_POOL_SIZE = pool_size
+    if http2 is not None:
+        USE_HTTP2 = http2
+    if host_pool_sizes:
+        HOST_POOL_SIZES.update(host_pool_sizes)
+    if host_overrides:
+        HOST_OVERRIDES.update({host: base.rstrip("/") for host, base in host_overrides.items()})
+
+
+def resolve_url(url):
+    """
+    `url` redirected to its host's override, if any. Rate limiting still uses the
+    original URL, so an overridden host keeps its real request budget.
+    """
+    parts = urlsplit(url)
+    base = HOST_OVERRIDES.get(parts.netloc)
+    if base is None:
+        return url
+
+    target = urlsplit(base)
+    return urlunsplit((target.scheme, target.netloc, target.path + parts.path, parts.query, parts.fragment))
+
+
+def set_rate_limiter(limiter):
+    """
+    Replace the limiter used by all sessions (None disables rate limiting).
+    """
+    global rate_limiter
+    rate_limiter = limiter
+
+
+class RateLimitedSession(requests.Session):
+    """
+    requests.Session that waits on the shared rate limiter before every request
+    and reports each response back to it.
+    """
+
+    def request(self, method, url, *args, **kwargs):
+        limiter = rate_limiter
+        if limiter is not None:
+            limiter.acquire(url)
+
+        response = super().request(method, resolve_url(url), *args, **kwargs)
+
+        if limiter is not None:
+            limiter.update(url, response)
+        return response
+
+
+class Http2Session:
+    """
+    Minimal requests-compatible wrapper around an HTTP/2 httpx client.
+
+    Responses are converted to requests.Response objects and transport errors to
+    requests exceptions, so callers' existing error handling keeps working.
+    """
+
+    def __init__(self, pool_size):
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.client = httpx.Client(http2=True, limits=limits)
+
+    def get(self, url, params=None, headers=None, auth=None, timeout=None, **kwargs):
+        limiter = rate_limiter
+        if limiter is not None:
+            limiter.acquire(url)
+
+        try:
+            r = self.client.get(resolve_url(url), params=params, headers=headers, auth=auth, timeout=timeout)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e))
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+
+        response = requests.Response()
+        response.status_code = r.status_code
+        response.reason = r.reason_phrase
+        response.headers = CaseInsensitiveDict(r.headers)
+        response.url = str(r.url)
+        response.encoding = r.encoding
+        response._content = r.content
+
+        if limiter is not None:
+            limiter.update(url, response)
+        return response
+
+    def close(self):
+        self.client.close()
+
+
+def create_session(host):
+    """
+    Build a new pooled session for one host.
+    """
+    pool_size = HOST_POOL_SIZES.get(host, DEFAULT_POOL_SIZE)
+
+    if USE_HTTP2 and httpx is not None:
+        return Http2Session(pool_size)
+
+    session = RateLimitedSession()
+    # One pool per host; callers do their own retries, so the adapter does not
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(url):
+    """
+    Return the shared keep-alive session for the host of `url` (or a bare host name).
+    """
+    host = urlsplit(url).netloc or url
+
+    with sessions_lock:
+        if host not in sessions:
+            sessions[host] = create_session(host)
+        return sessions[host]
+
+
+def get(url, **kwargs):
+    """
+    Drop-in replacement for requests.get() that reuses pooled connections.
+    """
+    return get_session(url).get(url, **kwargs)
+
+
+def close_all():
+    """
+    Close every pooled session, e.g. at the end of a long run.
+    """
+    with sessions_lock:
+        for session in sessions.values():
+            session.close()
+        sessions.clear()